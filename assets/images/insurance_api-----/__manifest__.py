@@ -14,6 +14,7 @@ This module extends the sales order model to include additional fields for manag
     'depends': ['base', 'sale_management', 'account'],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron.xml',
         'views/insurance_api_views.xml',
         'views/portal_sale_account_payment_term.xml',
         'views/portal_contract.xml',
@@ -27,6 +28,11 @@ This module extends the sales order model to include additional fields for manag
         'views/contract_company_tuc.xml',
         'views/contract_company_cor.xml',
         'views/contract_company_nac.xml',
+        'views/contract_print_batch_views.xml',
+        'views/payment_schedule_report_views.xml',
+        'views/order_renewal_batch_views.xml',
+        'wizard/payment_term_rate_simulation_views.xml',
+        'wizard/sale_order_insurance_mass_update_views.xml',
     ],
     'license': 'LGPL-3',
     'installable': True,
@@ -1,4 +1,4 @@
 # -*- coding: utf-8 -*-
 
 from . import portal
-
+from . import policy_lookup
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+from odoo import http
+from odoo.http import request
+
+from ..models import metrics
+
+
+class InsurancePolicyLookupController(http.Controller):
+    """API JSON de consulta de pólizas para el back office y las integraciones"""
+
+    @http.route(['/insurance_api/policies/lookup'], type='json', auth='user', methods=['POST'])
+    @metrics.instrumented('api.policy_lookup')
+    def policy_lookup(self, policy_number, partial=False, limit=80, cursor=None, **kwargs):
+        return request.env['sale.order'].lookup_policies(policy_number, partial=partial, limit=limit, cursor=cursor)
+
+    @http.route(['/insurance_api/contracts/expiring'], type='json', auth='user', methods=['POST'])
+    @metrics.instrumented('api.expiring_contracts')
+    def expiring_contracts(self, date_from, date_to, school_year=None, limit=100, cursor=None, **kwargs):
+        return request.env['sale.order'].search_expiring_contracts(
+            date_from, date_to, school_year=school_year, limit=limit, cursor=cursor)
@@ -1,14 +1,116 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
+import hmac
+import threading
+import time
+from collections import deque
+
 from odoo import _, http, fields
 from odoo.http import request
-from odoo.exceptions import AccessError
+from odoo.exceptions import AccessError, UserError
+from odoo.tools import config
+from odoo.tools.lru import LRU
+
+from ..models import metrics
+
+# Límite de solicitudes a las rutas JSON públicas, por token de acceso e IP
+RATE_LIMIT_REQUESTS = 30
+# Límite por IP sola: el token lo elige quien llama, así que no alcanza para limitar
+RATE_LIMIT_IP_REQUESTS = 120
+RATE_LIMIT_PERIOD = 60  # segundos
+
+
+class PortalRateLimiter:
+    """Limitador en memoria de ventana deslizante, local a cada proceso"""
+
+    def __init__(self, max_requests, period, max_keys=10000):
+        self.max_requests = max_requests
+        self.period = period
+        self._hits = LRU(max_keys)
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                hits = self._hits[key] = deque()
+            while hits and hits[0] <= now - self.period:
+                hits.popleft()
+            if len(hits) >= self.max_requests:
+                return False
+            hits.append(now)
+            return True
+
+
+_rate_limiter = PortalRateLimiter(RATE_LIMIT_REQUESTS, RATE_LIMIT_PERIOD)
+_ip_rate_limiter = PortalRateLimiter(RATE_LIMIT_IP_REQUESTS, RATE_LIMIT_PERIOD)
+
+
+class InsuranceMetricsController(http.Controller):
+
+    @http.route(['/insurance_api/metrics'], type='http', auth='none', methods=['GET'], save_session=False)
+    def insurance_api_metrics(self, **kwargs):
+        """
+        Métricas de los caminos críticos en formato Prometheus. Requiere la
+        opción insurance_api_metrics_token del archivo de configuración,
+        enviada como 'Authorization: Bearer <token>'.
+        """
+        token = config.get('insurance_api_metrics_token')
+        authorization = request.httprequest.headers.get('Authorization', '')
+        if not metrics.ENABLED or not token or not hmac.compare_digest(authorization, f'Bearer {token}'):
+            return request.not_found()
+        return request.make_response(metrics.render_prometheus(), headers=[
+            ('Content-Type', 'text/plain; version=0.0.4; charset=utf-8'),
+        ])
 
 
 class PaymentTermPortalController(http.Controller):
+
+    def _check_rate_limit(self, access_token):
+        """
+        Verifica el límite de solicitudes antes de cualquier acceso al ORM.
+        Devuelve la respuesta de error si se superó, o None.
+        """
+        remote_addr = request.httprequest.remote_addr
+        if _ip_rate_limiter.allow(remote_addr) and _rate_limiter.allow((access_token or '', remote_addr)):
+            return None
+        request.future_response.headers['Retry-After'] = str(RATE_LIMIT_PERIOD)
+        return {
+            'success': False,
+            'error': 'Demasiadas solicitudes. Intente nuevamente en unos minutos.',
+        }
+
+    def _check_order_access(self, order_sudo, access_token, operation='read'):
+        """
+        Con token, valida el token de la orden; sin token, exige que el usuario
+        actual tenga permiso de operation sobre la orden (los visitantes
+        anónimos no lo tienen). order_sudo es sudo: se controla sin sudo.
+        """
+        if access_token:
+            return order_sudo.access_token == access_token
+        order = order_sudo.with_user(request.env.user).sudo(False)
+        try:
+            order.check_access_rights(operation)
+            order.check_access_rule(operation)
+        except AccessError:
+            return False
+        return True
+
+    def _check_etag(self, *parts):
+        """
+        Agrega el ETag calculado a partir de parts a la respuesta.
+        Devuelve True si coincide con If-None-Match (el cliente ya tiene la versión vigente).
+        """
+        etag = '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+        request.future_response.headers['ETag'] = etag
+        request.future_response.headers['Cache-Control'] = 'private, no-cache'
+        return etag in request.httprequest.headers.get('If-None-Match', '')
     
     @http.route(['/my/orders/<int:order_id>/select_payment_term'], 
                 type='http', auth="public", website=True, methods=['POST'])
+    @metrics.instrumented('portal.select_payment_term')
     def select_payment_term(self, order_id, payment_term_id, access_token=None, **kwargs):
         """Cambia el plan de pago seleccionado"""
         try:
@@ -18,8 +120,8 @@ class PaymentTermPortalController(http.Controller):
             if not order.exists():
                 return request.redirect('/my/orders')
             
-            # Verificar el token si existe
-            if access_token and order.access_token != access_token:
+            # Verificar el token o, sin token, el permiso de escritura del usuario
+            if not self._check_order_access(order, access_token, 'write'):
                 return request.redirect('/my/orders')
             
             # Solo cambiar si esta en borrador o enviada
@@ -38,7 +140,11 @@ class PaymentTermPortalController(http.Controller):
     
     @http.route(['/my/orders/<int:order_id>/update_payment_term'],
                 type='json', auth="public", website=True, methods=['POST'])
+    @metrics.instrumented('portal.update_payment_term')
     def update_payment_term(self, order_id, term_id, access_token=None, **kwargs):
+        limited = self._check_rate_limit(access_token)
+        if limited:
+            return limited
         try:
             # Validar que el término de pago existe
             if not term_id or term_id == '':
@@ -64,28 +170,18 @@ class PaymentTermPortalController(http.Controller):
                     'error': 'La orden de venta no existe'
                 }
 
-            if access_token:
-                if order_sudo.access_token != access_token:
-                    return {
-                        'success': False,
-                        'error': 'Token de acceso inválido'
-                    }
-            else:
-                try:
-                    order_sudo.check_access_rights('write')
-                    order_sudo.check_access_rule('write')
-                except AccessError:
-                    return {
-                        'success': False,
-                        'error': 'No tiene permisos para modificar esta orden'
-                    }
+            if not self._check_order_access(order_sudo, access_token, 'write'):
+                return {
+                    'success': False,
+                    'error': 'Token de acceso inválido' if access_token else 'No tiene permisos para modificar esta orden'
+                }
             if order_sudo.state not in ('draft', 'sent'):
                 return {
                     'success': False,
                     'error': 'La orden no puede ser modificada en su estado actual'
                 }
-            payment_term = request.env['account.payment.term'].sudo().browse(term_id)
-            if not payment_term.exists():
+            catalog = request.env['account.payment.term']._get_portal_catalog(order_sudo.company_id.id)
+            if term_id not in [catalog_term[0] for catalog_term in catalog]:
                 return {
                     'success': False,
                     'error': 'El término de pago seleccionado no existe'
@@ -115,64 +211,90 @@ class PaymentTermPortalController(http.Controller):
 
     @http.route(['/my/orders/<int:order_id>/get_payment_term_installments'],
                 type='json', auth="public", website=True, methods=['POST'])
+    @metrics.instrumented('portal.get_payment_term_installments')
     def get_payment_term_installments(self, order_id, term_id, access_token=None, **kwargs):
+        limited = self._check_rate_limit(access_token)
+        if limited:
+            return limited
         try:
             order_sudo = request.env['sale.order'].sudo().browse(order_id)
             if not order_sudo.exists():
                 return {'error': 'Sale order not found'}
 
-            if access_token and order_sudo.access_token != access_token:
+            if not self._check_order_access(order_sudo, access_token):
                 return {'error': 'Invalid access token'}
 
             if not term_id or term_id == '':
                 return {'success': True, 'installments': []}
 
-            payment_term = request.env['account.payment.term'].sudo().browse(int(term_id))
-            if not payment_term.exists():
-                return {'error': 'Payment term not found'}
+            term_id = int(term_id)
+            catalog = request.env['account.payment.term']._get_portal_catalog(order_sudo.company_id.id)
+            term_write_date = next((term[3] for term in catalog if term[0] == term_id), None)
+            if self._check_etag(order_sudo.id, order_sudo.write_date, term_id, term_write_date):
+                return {'success': True, 'not_modified': True}
 
-            amount = order_sudo.amount_total
-            result = []
-            currency = order_sudo.currency_id
-            for line in payment_term.line_ids.sorted(key=lambda r: r.id):
-                if line.value == 'fixed':
-                    amount -= line.value_amount
-                    result.append((line, line.value_amount))
-                elif line.value == 'percent':
-                    amount_line = currency.round(order_sudo.amount_total * line.value_amount / 100)
-                    amount -= amount_line
-                    result.append((line, amount_line))
-                elif line.value == 'balance':
-                    result.append((line, currency.round(amount)))
+            installments = order_sudo._get_catalog_installments(term_id)
+            if installments is None:
+                return {'error': 'Payment term not found'}
 
             # format the installments for JSON response
             formatted_installments = []
-            for line, amount_to_pay in result:
-                final_amount = amount_to_pay * (1 + line.interest_rate / 100) * (1 - line.discount_rate / 100)
+            for installment in installments:
                 formatted_installments.append({
-                    'amount': currency.round(final_amount),
-                    'interest_rate': line.interest_rate,
-                    'discount_rate': line.discount_rate,
+                    'amount': installment.amount,
+                    'interest_rate': installment.interest_rate,
+                    'discount_rate': installment.discount_rate,
                 })
 
             return {'success': True, 'installments': formatted_installments, 'currency': order_sudo.currency_id.name}
         except Exception as e:
             return {'error': str(e)}
 
+    @http.route(['/my/orders/<int:order_id>/get_all_payment_term_installments'],
+                type='json', auth="public", website=True, methods=['POST'])
+    @metrics.instrumented('portal.get_all_payment_term_installments')
+    def get_all_payment_term_installments(self, order_id, access_token=None, **kwargs):
+        """Devuelve las cuotas de todos los planes disponibles en una sola respuesta"""
+        limited = self._check_rate_limit(access_token)
+        if limited:
+            return limited
+        try:
+            order_sudo = request.env['sale.order'].sudo().browse(order_id)
+            if not order_sudo.exists():
+                return {'error': 'Sale order not found'}
+
+            if not self._check_order_access(order_sudo, access_token):
+                return {'error': 'Invalid access token'}
+
+            catalog = request.env['account.payment.term']._get_portal_catalog(order_sudo.company_id.id)
+            if self._check_etag(order_sudo.id, order_sudo.write_date, [(term[0], term[3]) for term in catalog]):
+                return {'success': True, 'not_modified': True}
+
+            plans = []
+            for term_id, term_name, installments in order_sudo._get_payment_term_plans():
+                plans.append({
+                    'term_id': term_id,
+                    'name': term_name,
+                    'installments': [{
+                        'amount': installment.amount,
+                        'interest_rate': installment.interest_rate,
+                        'discount_rate': installment.discount_rate,
+                    } for installment in installments],
+                })
+
+            return {'success': True, 'plans': plans, 'currency': order_sudo.currency_id.name}
+        except Exception as e:
+            return {'error': str(e)}
+
     @http.route(['/my/contract/<int:order_id>'], type='http', auth="public", website=True)
+    @metrics.instrumented('portal.portal_contract_view')
     def portal_contract_view(self, order_id, access_token=None, **kwargs):
         order_sudo = request.env['sale.order'].sudo().browse(order_id)
         if not order_sudo.exists():
              return request.redirect('/my')
              
-        if access_token and order_sudo.access_token != access_token:
-             return request.redirect('/my')
-        if not access_token:
-            try:
-                order_sudo.check_access_rights('read')
-                order_sudo.check_access_rule('read')
-            except AccessError:
-                return request.redirect('/my')
+        if not self._check_order_access(order_sudo, access_token):
+            return request.redirect('/my')
 
         values = {
             'sale_order': order_sudo,
@@ -181,23 +303,26 @@ class PaymentTermPortalController(http.Controller):
         return request.render("insurance_api.portal_contract_page", values)
 
     @http.route(['/my/contract/<int:order_id>/sign'], type='json', auth="public", website=True, methods=['POST'])
+    @metrics.instrumented('portal.portal_contract_sign')
     def portal_contract_sign(self, order_id, access_token=None, name=None, signature=None):
+        limited = self._check_rate_limit(access_token)
+        if limited:
+            return {'error': limited['error']}
         order_sudo = request.env['sale.order'].sudo().browse(order_id)
         if not order_sudo.exists():
             return {'error': _('Order not found')}
 
-        if access_token and order_sudo.access_token != access_token:
-             return {'error': _('Invalid access token')}
-        if not access_token:
-            try:
-                order_sudo.check_access_rights('write')
-                order_sudo.check_access_rule('write')
-            except AccessError:
-                 return {'error': _('Access Denied')}
+        if not self._check_order_access(order_sudo, access_token, 'write'):
+            return {'error': _('Invalid access token') if access_token else _('Access Denied')}
 
         if not signature:
             return {'error': _('Signature is missing')}
 
+        try:
+            signature = order_sudo._prepare_contract_signature(signature)
+        except UserError as e:
+            return {'error': str(e)}
+
         order_sudo.write({
             'contract_signature': signature,
             'contract_signed_by': name,
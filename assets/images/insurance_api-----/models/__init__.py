@@ -1,3 +1,9 @@
 # -*- coding: utf-8 -*-
 
-from . import insurance_api
\ No newline at end of file
+from . import insurance_api
+from . import contract_print_batch
+from . import payment_matching
+from . import insurance_import
+from . import order_renewal
+from . import policy_lookup
+from . import contract_reminder
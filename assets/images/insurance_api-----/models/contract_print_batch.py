@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+import io
+import logging
+import tempfile
+from contextlib import ExitStack
+
+from odoo import _, api, fields, models
+from odoo.tools.pdf import PdfFileReader, PdfFileWriter
+
+_logger = logging.getLogger(__name__)
+
+CONTRACT_REPORT_REF = 'sale.action_report_pro_forma_invoice'
+
+
+class ContractPrintBatch(models.Model):
+    _name = 'sale.order.contract.print.batch'
+    _description = 'Impresión de Contratos en Lote'
+    _order = 'id desc'
+
+    name = fields.Char(string="Nombre", required=True, default=lambda self: _("Contratos %s", fields.Date.context_today(self)))
+    order_ids = fields.Many2many('sale.order', string="Órdenes de Venta", required=True)
+    chunk_size = fields.Integer(string="Contratos por Bloque", default=50,
+                                help="Cantidad de contratos que se renderizan juntos en cada paso del proceso")
+    printed_count = fields.Integer(string="Contratos Impresos", default=0, readonly=True)
+    order_count = fields.Integer(string="Cantidad de Contratos", compute='_compute_progress')
+    progress = fields.Float(string="Progreso (%)", compute='_compute_progress')
+    state = fields.Selection([
+        ('pending', 'Pendiente'),
+        ('running', 'En Proceso'),
+        ('done', 'Terminado'),
+        ('failed', 'Error'),
+    ], string="Estado", default='pending', readonly=True)
+    error_message = fields.Text(string="Error", readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', string="PDF", readonly=True, ondelete='set null')
+
+    @api.depends('order_ids', 'printed_count')
+    def _compute_progress(self):
+        for batch in self:
+            batch.order_count = len(batch.order_ids)
+            batch.progress = 100.0 * batch.printed_count / batch.order_count if batch.order_count else 0.0
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        batches = super(ContractPrintBatch, self).create(vals_list)
+        self.env.ref('insurance_api.ir_cron_contract_print_batch')._trigger()
+        return batches
+
+    def action_retry(self):
+        """Reintenta un lote con error desde el último bloque impreso"""
+        self.filtered(lambda b: b.state == 'failed').write({'state': 'pending', 'error_message': False})
+        self.env.ref('insurance_api.ir_cron_contract_print_batch')._trigger()
+
+    def _get_next_chunk(self):
+        self.ensure_one()
+        orders = self.order_ids.sorted('id')
+        return orders[self.printed_count:self.printed_count + max(self.chunk_size, 1)]
+
+    def _get_part_attachments(self):
+        """PDF de cada bloque ya impreso, en el orden en que se imprimieron"""
+        self.ensure_one()
+        return self.env['ir.attachment'].search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('res_field', '=', False),
+            ('id', '!=', self.attachment_id.id),
+        ], order='id')
+
+    def _process_next_chunk(self):
+        """
+        Renderiza el siguiente bloque de contratos y lo guarda como un adjunto
+        propio. Cada paso sólo tiene en memoria el PDF de su bloque; los
+        bloques se unen una única vez al terminar.
+        """
+        self.ensure_one()
+        chunk = self._get_next_chunk()
+        if not chunk:
+            self._merge_parts()
+            return
+
+        pdf_content, _report_type = self.env['ir.actions.report']._render_qweb_pdf(CONTRACT_REPORT_REF, res_ids=chunk.ids)
+        self.env['ir.attachment'].create({
+            'name': f"{self.name} - {self.printed_count + 1:06d}.pdf",
+            'type': 'binary',
+            'mimetype': 'application/pdf',
+            'raw': pdf_content,
+            'res_model': self._name,
+            'res_id': self.id,
+        })
+
+        self.printed_count += len(chunk)
+        if self.printed_count >= len(self.order_ids):
+            self._merge_parts()
+        else:
+            self.state = 'running'
+
+    def _open_part(self, part, stack):
+        """Abre el PDF de un bloque desde el filestore, sin cargarlo en memoria"""
+        if part.store_fname:
+            return stack.enter_context(open(part._full_path(part.store_fname), 'rb'))
+        return io.BytesIO(part.raw)
+
+    def _merge_parts(self):
+        """
+        Une los PDF de los bloques en el adjunto final y borra los parciales.
+        Las páginas se leen de cada bloque a medida que se escriben en un
+        archivo temporal, en lugar de cargar todos los bloques a la vez.
+        """
+        self.ensure_one()
+        parts = self._get_part_attachments()
+        if parts:
+            with ExitStack() as stack, tempfile.TemporaryFile() as merged:
+                writer = PdfFileWriter()
+                for part in parts:
+                    reader = PdfFileReader(self._open_part(part, stack), strict=False)
+                    for page in range(reader.getNumPages()):
+                        writer.addPage(reader.getPage(page))
+                writer.write(merged)
+                merged.seek(0)
+                pdf_content = merged.read()
+            self.attachment_id = self.env['ir.attachment'].create({
+                'name': f"{self.name}.pdf",
+                'type': 'binary',
+                'mimetype': 'application/pdf',
+                'raw': pdf_content,
+                'res_model': self._name,
+                'res_id': self.id,
+            })
+            parts.unlink()
+        self.state = 'done'
+
+    @api.model
+    def _cron_process_batches(self):
+        """
+        Procesa un bloque de cada lote pendiente e informa el avance al cron
+        en contratos: impresos en esta ejecución y pendientes de imprimir.
+        """
+        batches = self.search([('state', 'in', ('pending', 'running'))])
+        printed_before = sum(batches.mapped('printed_count'))
+        for batch in batches:
+            try:
+                with self.env.cr.savepoint():
+                    batch._process_next_chunk()
+            except Exception as e:
+                _logger.exception("Error al imprimir el lote de contratos %s", batch.id)
+                batch.write({'state': 'failed', 'error_message': str(e)})
+
+        remaining = sum(
+            batch.order_count - batch.printed_count
+            for batch in batches if batch.state in ('pending', 'running')
+        )
+        done = sum(batches.mapped('printed_count')) - printed_before
+        self.env['ir.cron']._notify_progress(done=done, remaining=remaining)
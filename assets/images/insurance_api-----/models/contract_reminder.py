@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models, tools
+
+_logger = logging.getLogger(__name__)
+
+CONTRACT_REMINDER_TEMPLATE = 'insurance_api.email_contract_signature'
+# Días entre dos recordatorios a la misma orden
+CONTRACT_REMINDER_INTERVAL_PARAM = 'insurance_api.contract_reminder_interval_days'
+# Días de anticipación con que se avisa el fin del contrato
+CONTRACT_EXPIRY_NOTICE_PARAM = 'insurance_api.contract_expiry_notice_days'
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    contract_reminder_sent_on = fields.Datetime(
+        string="Último Recordatorio de Contrato", copy=False, readonly=True,
+        help="Fecha del último recordatorio automático de firma o vencimiento del contrato")
+
+    def init(self):
+        super(SaleOrder, self).init()
+        # Contratos sin firmar de órdenes enviadas o confirmadas (los que persigue el cron de recordatorios)
+        tools.create_index(self._cr, 'sale_order_unsigned_contract_index', self._table, ['id'],
+                           where="contract_signed_on IS NULL AND state IN ('sent', 'sale')")
+
+    @api.model
+    def _get_contract_reminder_domain(self):
+        """Órdenes sin firmar o con el contrato por vencer que no recibieron un recordatorio reciente"""
+        ICP = self.env['ir.config_parameter'].sudo()
+        interval_days = int(ICP.get_param(CONTRACT_REMINDER_INTERVAL_PARAM, 7))
+        notice_days = int(ICP.get_param(CONTRACT_EXPIRY_NOTICE_PARAM, 30))
+        today = fields.Date.context_today(self)
+        return [
+            ('state', 'in', ('sent', 'sale')),
+            '|', ('contract_reminder_sent_on', '=', False),
+                 ('contract_reminder_sent_on', '<', fields.Datetime.now() - timedelta(days=interval_days)),
+            '|', ('contract_signed_on', '=', False),
+                 '&', ('contract_end_date', '>=', today),
+                      ('contract_end_date', '<=', today + timedelta(days=notice_days)),
+        ]
+
+    @api.model
+    def _cron_send_contract_reminders(self, batch_size=1000, chunk_size=100):
+        """
+        Envía los recordatorios de firma y de vencimiento de contratos.
+        Busca las órdenes con una sola consulta, renderiza la plantilla por
+        bloques y encola los correos en la cola de mails con un create por
+        bloque. El cron se vuelve a ejecutar mientras queden órdenes.
+        """
+        template = self.env.ref(CONTRACT_REMINDER_TEMPLATE, raise_if_not_found=False)
+        if not template:
+            _logger.warning("No se encontró la plantilla %s, no se envían recordatorios", CONTRACT_REMINDER_TEMPLATE)
+            return
+
+        domain = self._get_contract_reminder_domain()
+        orders = self.search(domain, order='id', limit=batch_size)
+        if not orders:
+            return
+
+        for start in range(0, len(orders), chunk_size):
+            chunk = orders[start:start + chunk_size]
+            chunk._queue_contract_reminders(template)
+            chunk.write({'contract_reminder_sent_on': fields.Datetime.now()})
+
+        self.env.ref('mail.ir_cron_mail_scheduler_action')._trigger()
+        remaining = self.search_count(domain)
+        self.env['ir.cron']._notify_progress(done=len(orders), remaining=remaining)
+
+    def _queue_contract_reminders(self, template):
+        """Renderiza la plantilla para todas las órdenes y crea los correos salientes juntos"""
+        recipients = self.filtered(lambda o: o.partner_id.email)
+        if not recipients:
+            return self.env['mail.mail']
+
+        subjects = template._render_field('subject', recipients.ids, compute_lang=True)
+        bodies = template._render_field('body_html', recipients.ids, compute_lang=True,
+                                        options={'post_process': True})
+        return self.env['mail.mail'].sudo().create([{
+            'model': self._name,
+            'res_id': order.id,
+            'subject': subjects[order.id],
+            'body_html': bodies[order.id],
+            'email_from': (order.user_id.email_formatted or order.company_id.email_formatted
+                           or self.env.user.email_formatted),
+            'recipient_ids': [(6, 0, order.partner_id.ids)],
+            'auto_delete': template.auto_delete,
+            'message_type': 'email',
+        } for order in recipients])
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de cálculo de cuotas.
+
+Trabaja sólo con tuplas (no con registros del ORM) para que el mismo cálculo
+sirva a la generación del cronograma, a la validación del total y a la vista
+previa del portal, y para poder cachear el resultado entre llamadas.
+"""
+
+from collections import namedtuple
+
+from dateutil.relativedelta import relativedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from odoo.tools import float_round
+from odoo.tools.lru import LRU
+
+# Definición mínima de una línea de término de pago
+TermLine = namedtuple('TermLine', [
+    'installment_number',
+    'value',
+    'value_amount',
+    'interest_rate',
+    'discount_rate',
+    'due_date',
+    'delay_type',
+    'nb_days',
+])
+
+# Cuota calculada
+Installment = namedtuple('Installment', [
+    'installment_number',
+    'base_amount',
+    'amount',
+    'due_date',
+    'interest_rate',
+    'discount_rate',
+])
+
+_installments_cache = LRU(4096)
+_plans_cache = LRU(1024)
+
+
+def compute_due_date(term_line, base_date):
+    """Calcula el vencimiento de una cuota a partir de la fecha base"""
+    if term_line.due_date:
+        return term_line.due_date
+    if term_line.delay_type == 'days_after_end_of_month':
+        return base_date + relativedelta(day=31, days=term_line.nb_days)
+    if term_line.delay_type == 'days_after_end_of_next_month':
+        return base_date + relativedelta(months=1, day=31, days=term_line.nb_days)
+    return base_date + relativedelta(days=term_line.nb_days)
+
+
+def compute_installments(term_lines, amount_total, rounding, base_date):
+    """
+    Divide amount_total según las líneas del término (percent / balance / fixed)
+    y aplica los factores de interés y descuento de cada línea.
+    Las líneas deben venir ordenadas por número de cuota.
+    Devuelve una tupla de Installment numeradas desde 1.
+    """
+    def _round(value):
+        return float_round(value, precision_rounding=rounding)
+
+    amount = amount_total
+    split = []
+    for term_line in term_lines:
+        if term_line.value == 'percent':
+            amount_line = _round(amount_total * term_line.value_amount / 100)
+            amount -= amount_line
+            split.append((term_line, amount_line))
+        elif term_line.value == 'balance':
+            split.append((term_line, _round(amount)))
+        elif term_line.value == 'fixed':
+            amount -= term_line.value_amount
+            split.append((term_line, term_line.value_amount))
+
+    installments = []
+    for installment_number, (term_line, base_amount) in enumerate(split, start=1):
+        interest_factor = (1 + term_line.interest_rate / 100)
+        discount_factor = (1 - term_line.discount_rate / 100)
+        installments.append(Installment(
+            installment_number=installment_number,
+            base_amount=base_amount,
+            amount=_round(base_amount * interest_factor * discount_factor),
+            due_date=compute_due_date(term_line, base_date),
+            interest_rate=term_line.interest_rate,
+            discount_rate=term_line.discount_rate,
+        ))
+    return tuple(installments)
+
+
+def amount_breakdown(amount, interest_rate, discount_rate):
+    """
+    Descompone el monto de una cuota en (monto base, interés, descuento)
+    a partir de sus tasas.
+    """
+    interest_factor = (1 + interest_rate / 100)
+    discount_factor = (1 - discount_rate / 100)
+    factor = interest_factor * discount_factor
+    if not interest_rate and not discount_rate:
+        base_amount = amount
+    else:
+        base_amount = amount / factor if factor > 0 else 0
+    return (
+        base_amount,
+        base_amount * (interest_rate / 100),
+        base_amount * interest_factor * (discount_rate / 100),
+    )
+
+
+def amount_breakdown_arrays(amounts, interest_rates, discount_rates):
+    """
+    Versión vectorizada de amount_breakdown sobre arrays de NumPy.
+    Devuelve (montos base, intereses, descuentos) redondeados a 2 decimales
+    HALF-UP, igual que el ORM al guardar los campos Float(16, 2).
+    """
+    interest_factors = 1 + interest_rates / 100
+    discount_factors = 1 - discount_rates / 100
+    factors = interest_factors * discount_factors
+    base_amounts = np.where(factors > 0, amounts / np.where(factors > 0, factors, 1), 0)
+    base_amounts = np.where((interest_rates == 0) & (discount_rates == 0), amounts, base_amounts)
+    cents = np.full_like(amounts, 0.01)
+    return (
+        round_arrays(base_amounts, cents),
+        round_arrays(base_amounts * (interest_rates / 100), cents),
+        round_arrays(base_amounts * interest_factors * (discount_rates / 100), cents),
+    )
+
+
+def round_arrays(values, roundings):
+    """
+    Versión vectorizada de float_round (HALF-UP) con una precisión por elemento.
+    Suma el mismo epsilon relativo que float_round antes de redondear.
+    """
+    normalized = values / roundings
+    magnitudes = np.abs(normalized)
+    epsilons = np.exp2(np.log2(np.where(magnitudes > 0, magnitudes, 1)) - 52)
+    return np.round(normalized + np.sign(normalized) * epsilons) * roundings
+
+
+def installment_totals_arrays(term_lines, amounts_total, roundings):
+    """
+    Versión vectorizada de compute_installments para muchos montos con el mismo
+    término: aplica las mismas reglas de división y redondeo y devuelve la
+    suma de las cuotas de cada monto. Los montos <= 0 no generan cuotas.
+    """
+    totals = np.zeros_like(amounts_total)
+    remaining = amounts_total.copy()
+    for term_line in term_lines:
+        if term_line.value == 'percent':
+            base_amounts = round_arrays(amounts_total * term_line.value_amount / 100, roundings)
+            remaining = remaining - base_amounts
+        elif term_line.value == 'balance':
+            base_amounts = round_arrays(remaining, roundings)
+        elif term_line.value == 'fixed':
+            remaining = remaining - term_line.value_amount
+            base_amounts = np.full_like(amounts_total, term_line.value_amount)
+        else:
+            continue
+        factor = (1 + term_line.interest_rate / 100) * (1 - term_line.discount_rate / 100)
+        totals += round_arrays(base_amounts * factor, roundings)
+    return np.where(amounts_total > 0, totals, 0.0)
+
+
+def get_installments(key, load_term_lines, amount_total, rounding, base_date):
+    """
+    Devuelve las cuotas cacheadas para key. load_term_lines sólo se llama
+    si el resultado no está en cache, para no leer las líneas del término.
+    key = (term_id, term_write_date, amount_total, currency_id, base_date)
+    """
+    installments = _installments_cache.get(key)
+    if installments is None:
+        installments = compute_installments(load_term_lines(), amount_total, rounding, base_date)
+        _installments_cache[key] = installments
+    return installments
+
+
+def get_plans(key, compute_plans):
+    """
+    Devuelve las cuotas de todos los planes cacheadas para key.
+    key = (order_id, amount_total, catálogo de términos de la compañía)
+    """
+    plans = _plans_cache.get(key)
+    if plans is None:
+        plans = compute_plans()
+        _plans_cache[key] = plans
+    return plans
+
+
+def clear_cache():
+    _installments_cache.clear()
+    _plans_cache.clear()
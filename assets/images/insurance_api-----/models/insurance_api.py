@@ -1,8 +1,55 @@
 # -*- coding: utf-8 -*-
 
-from odoo import _, api, fields, models
+import base64
+import binascii
+import functools
+import hashlib
+import io
+import re
+from collections import defaultdict
+
+from PIL import Image
+
+from odoo import _, api, fields, models, tools
+from odoo.exceptions import UserError
+from odoo.tools import float_compare, float_round
+from odoo.tools.image import image_process
 from num2words import num2words
 
+from . import installment_engine
+from . import metrics
+
+# Campos de sale.order que se imprimen en el contrato; si cambian, el PDF cacheado deja de ser válido
+CONTRACT_REPORT_FIELDS = [
+    'name', 'partner_id', 'company_id', 'amount_total', 'payment_term_id', 'payment_schedule_total',
+    'policy_number', 'school_year', 'insurer', 'insured_amount', 'events_limit', 'in_itinere_limit',
+    'events_max_quantity', 'in_itinere_max_quantity', 'emergencies', 'contract_start_date',
+    'contract_end_date', 'assistance_limit', 'in_itinere_plural_limit', 'contract_sign_date',
+    'show_insurance_table', 'legal_representative_name', 'legal_representative_dni',
+    'contract_signed_by', 'contract_signed_on',
+]
+CONTRACT_REPORT_ATTACHMENT_PREFIX = 'Contrato - '
+# Plantillas cuya modificación cambia el PDF del contrato
+CONTRACT_REPORT_TEMPLATE_KEYS = ['sale.report_saleorder_pro_forma', 'sale.report_saleorder_document']
+
+# Tamaño máximo aceptado para la firma recibida desde el portal (en base64) y tamaño con que se guarda
+CONTRACT_SIGNATURE_MAX_SIZE = 1024 * 1024
+CONTRACT_SIGNATURE_SIZE = (600, 300)
+# Resolución máxima de la firma: una imagen lisa comprime a pocos KB pero se decodifica completa
+CONTRACT_SIGNATURE_MAX_PIXELS = 4000 * 2000
+
+
+@functools.lru_cache(maxsize=4096)
+def _cents_to_words(cents):
+    """Convierte un monto en centavos a letras, ej: 'MIL QUINIENTOS PESOS CON 50/100'"""
+    if cents < 0:
+        return "MENOS " + _cents_to_words(-cents)
+    pesos, centavos = divmod(cents, 100)
+    words = num2words(pesos, lang='es').upper() + " PESOS"
+    if centavos:
+        words += f" CON {centavos:02d}/100"
+    return words
+
 
 class AccountPaymentTermLine(models.Model):
     _inherit = 'account.payment.term.line'
@@ -16,17 +63,155 @@ class AccountPaymentTermLine(models.Model):
              'Deje vacío para usar el cálculo automático basado en los días configurados.'
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(AccountPaymentTermLine, self).create(vals_list)
+        lines.payment_term_id._invalidate_installments_cache()
+        return lines
+
+    def write(self, vals):
+        terms = self.payment_term_id
+        res = super(AccountPaymentTermLine, self).write(vals)
+        (terms | self.payment_term_id)._invalidate_installments_cache()
+        return res
+
+    def unlink(self):
+        terms = self.payment_term_id
+        res = super(AccountPaymentTermLine, self).unlink()
+        terms.exists()._invalidate_installments_cache()
+        return res
+
 
 class AccountPaymentTerm(models.Model):
     _inherit = 'account.payment.term'
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        terms = super(AccountPaymentTerm, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return terms
+
+    def write(self, vals):
+        res = super(AccountPaymentTerm, self).write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super(AccountPaymentTerm, self).unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    def _invalidate_installments_cache(self):
+        """
+        Invalida las cuotas cacheadas de estos términos. Actualizar write_date
+        cambia la clave de cache también en los demás workers.
+        """
+        installment_engine.clear_cache()
+        if self:
+            self.write({})
+
+    def _get_installment_term_lines(self):
+        """Devuelve las líneas del término como tuplas ordenadas por número de cuota"""
+        self.ensure_one()
+        return tuple(
+            installment_engine.TermLine(
+                installment_number=line.installment_number,
+                value=line.value,
+                value_amount=line.value_amount,
+                interest_rate=line.interest_rate,
+                discount_rate=line.discount_rate,
+                due_date=line.due_date,
+                delay_type=line.delay_type,
+                nb_days=line.nb_days,
+            )
+            for line in self.line_ids.sorted(key=lambda r: (r.installment_number, r.id))
+        )
+
+    @api.model
+    @tools.ormcache('company_id', 'self.env.lang')
+    def _get_portal_catalog(self, company_id):
+        """
+        Catálogo de términos de pago disponibles para la compañía, como tuplas
+        (id, nombre, líneas, write_date). Se invalida al modificar términos o sus líneas.
+        """
+        terms = self.sudo().search([('company_id', 'in', [False, company_id])])
+        # Precarga de todas las líneas en una sola consulta
+        terms.line_ids.mapped('value')
+        return tuple(
+            (term.id, term.name, term._get_installment_term_lines(), term.write_date)
+            for term in terms
+        )
+
+    def _get_installments(self, amount_total, currency, base_date):
+        """
+        Calcula las cuotas del término para un monto dado.
+        El resultado se cachea por (término, write_date, monto, moneda, fecha base).
+        """
+        self.ensure_one()
+        if not isinstance(self.id, int):
+            return installment_engine.compute_installments(
+                self._get_installment_term_lines(), amount_total, currency.rounding, base_date)
+        key = (self.id, self.write_date, amount_total, currency.id, base_date)
+        return installment_engine.get_installments(
+            key, self._get_installment_term_lines, amount_total, currency.rounding, base_date)
+
+    def simulate_rate_change(self, line_rates):
+        """
+        Simula cómo cambiaría el total de los cronogramas de las órdenes abiertas
+        con este término si sus líneas tuvieran otras tasas. No escribe nada.
+        line_rates: {id de línea del término: {'interest_rate': x, 'discount_rate': y}}
+        Devuelve una lista de totales por moneda:
+        [{'currency_id', 'order_count', 'current_total', 'simulated_total', 'delta'}]
+        """
+        self.ensure_one()
+        line_rates = {int(line_id): rates for line_id, rates in line_rates.items()}
+        term_lines = tuple(
+            term_line._replace(
+                interest_rate=line_rates.get(line.id, {}).get('interest_rate', term_line.interest_rate),
+                discount_rate=line_rates.get(line.id, {}).get('discount_rate', term_line.discount_rate),
+            )
+            for line, term_line in zip(
+                self.line_ids.sorted(key=lambda r: (r.installment_number, r.id)),
+                self._get_installment_term_lines())
+        )
+
+        orders = self.env['sale.order'].search_fetch(
+            [('payment_term_id', '=', self.id), ('state', 'in', ('draft', 'sent', 'sale'))],
+            ['amount_total', 'currency_id', 'payment_schedule_total'])
+
+        results = []
+        for currency in orders.currency_id:
+            currency_orders = orders.filtered(lambda o: o.currency_id == currency)
+            amounts_total = currency_orders.mapped('amount_total')
+            current_total = sum(currency_orders.mapped('payment_schedule_total'))
+            if installment_engine.np is not None:
+                np = installment_engine.np
+                amounts = np.array(amounts_total, dtype=float)
+                simulated_total = float(installment_engine.installment_totals_arrays(
+                    term_lines, amounts, np.full_like(amounts, currency.rounding)).sum())
+            else:
+                today = fields.Date.context_today(self)
+                simulated_total = sum(
+                    sum(installment.amount for installment in installment_engine.compute_installments(
+                        term_lines, amount_total, currency.rounding, today))
+                    for amount_total in amounts_total if amount_total > 0
+                )
+            results.append({
+                'currency_id': currency.id,
+                'order_count': len(currency_orders),
+                'current_total': currency.round(current_total),
+                'simulated_total': currency.round(simulated_total),
+                'delta': currency.round(simulated_total - current_total),
+            })
+        return results
+
 
 class InsuranceSaleOrder(models.Model):
     _inherit = 'sale.order'
     policy_number = fields.Char(string="Número de Póliza", default='', readonly=False, tracking=True, copy=False,
-                                store=True)
+                                store=True, index='trigram')
     school_year = fields.Char(string="Período Lectivo", default='', readonly=False, tracking=True, copy=False,
-                              store=True)
+                              store=True, index=True)
     insurer = fields.Char(string="Aseguradora", default='Mercantil Andina Cia. de Seguros', readonly=False,
                           tracking=True, copy=False, store=True)
     insured_amount = fields.Float(string="Suma Asegurada", default=0.0, readonly=False, tracking=True, copy=False,
@@ -62,10 +247,12 @@ class InsuranceSaleOrder(models.Model):
     legal_representative_dni = fields.Char(string="DNI del Representante Legal", tracking=True)
 
     # Campos para la firma digital del contrato (separado de la orden de venta)
-    contract_signature = fields.Binary(string="Firma del Contrato", copy=False, attachment=True)
+    contract_signature = fields.Image(string="Firma del Contrato", copy=False, attachment=True,
+                                      max_width=CONTRACT_SIGNATURE_SIZE[0], max_height=CONTRACT_SIGNATURE_SIZE[1])
     contract_signed_by = fields.Char(string="Firmado por (Contrato)", copy=False)
     contract_signed_on = fields.Datetime(string="Firmado el (Contrato)", copy=False)
-    signature_thumb = fields.Image(related="contract_signature", max_width=150, max_height=75)
+    signature_thumb = fields.Image(related="contract_signature", max_width=150, max_height=75, store=True)
+    contract_signature_checksum = fields.Char(compute='_compute_contract_signature_checksum')
 
     # obtener fecha de la firma del contrato
     @api.depends('signed_on', 'contract_signed_on')
@@ -79,12 +266,45 @@ class InsuranceSaleOrder(models.Model):
             else:
                 order.contract_sign_date = False
 
+    @api.model
+    def _prepare_contract_signature(self, signature):
+        """
+        Valida y normaliza la firma recibida desde el portal: controla el tamaño
+        antes de decodificarla y la guarda como PNG compacto, así la miniatura
+        se calcula una sola vez al firmar. Devuelve la firma en base64.
+        """
+        if len(signature) > CONTRACT_SIGNATURE_MAX_SIZE:
+            raise UserError(_("La firma es demasiado grande."))
+        try:
+            image = base64.b64decode(signature, validate=True)
+            # Sólo se lee la cabecera: controla la resolución antes de decodificar los píxeles
+            width, height = Image.open(io.BytesIO(image)).size
+            if width * height > CONTRACT_SIGNATURE_MAX_PIXELS:
+                raise UserError(_("La firma es demasiado grande."))
+            image = image_process(image, size=CONTRACT_SIGNATURE_SIZE, output_format='PNG')
+        except UserError:
+            raise
+        except (binascii.Error, ValueError, OSError, Image.DecompressionBombError):
+            raise UserError(_("La firma no es una imagen válida."))
+        return base64.b64encode(image)
+
     # Nombre de los campos en pesos
     def _amount_to_words(self, amount):
+        """
+        Monto en letras con centavos. Se redondea a 2 decimales HALF-UP, igual
+        que los montos impresos. Las conversiones se cachean a nivel de proceso.
+        """
+        return _cents_to_words(int(round(float_round(amount or 0, precision_digits=2) * 100)))
 
-        amount = amount or 0
-        words = num2words(amount, lang='es')
-        return words.upper() + " PESOS"
+    def _amounts_to_words(self, amounts):
+        """
+        Versión en lote de _amount_to_words para convertir todos los montos
+        de un documento en una sola llamada.
+        Acepta una lista (devuelve una lista) o un dict (devuelve un dict con las mismas claves).
+        """
+        if isinstance(amounts, dict):
+            return {key: self._amount_to_words(amount) for key, amount in amounts.items()}
+        return [self._amount_to_words(amount) for amount in amounts]
 
 
     payment_schedule_lines = fields.One2many(
@@ -103,12 +323,30 @@ class InsuranceSaleOrder(models.Model):
         help='Suma total de todas las cuotas con interés y descuento aplicados'
     )
 
+    payment_schedule_expected_total = fields.Monetary(
+        string='Total Esperado del Cronograma',
+        compute='_compute_payment_schedule_expected_total',
+        store=True,
+        currency_field='currency_id',
+        help='Total que deben sumar las cuotas según el término de pago, con interés y descuento'
+    )
+
     @api.depends('payment_schedule_lines.amount')
     def _compute_payment_schedule_total(self):
         """Calcula el total real de todas las cuotas"""
         for order in self:
             order.payment_schedule_total = sum(order.payment_schedule_lines.mapped('amount'))
 
+    @api.depends('amount_total', 'currency_id', 'date_order', 'payment_term_id',
+                 'payment_term_id.line_ids.installment_number', 'payment_term_id.line_ids.value',
+                 'payment_term_id.line_ids.value_amount', 'payment_term_id.line_ids.interest_rate',
+                 'payment_term_id.line_ids.discount_rate')
+    def _compute_payment_schedule_expected_total(self):
+        """Calcula el total esperado sólo cuando cambian el término, sus líneas o el monto"""
+        ScheduleLine = self.env['sale.order.payment.schedule.line']
+        for order in self:
+            order.payment_schedule_expected_total = ScheduleLine._calcular_total_esperado(order)
+
     @api.onchange('payment_term_id')
     def _onchange_payment_term_id(self):
         """Regenera automáticamente el cronograma cuando cambia el término de pago"""
@@ -183,6 +421,130 @@ class InsuranceSaleOrder(models.Model):
         return f'/my/contract/{self.id}?access_token={self.access_token}'
     
 
+    @api.depends('contract_signature')
+    def _compute_contract_signature_checksum(self):
+        """
+        Checksum del adjunto de la firma. Al no estar almacenado se calcula para
+        todas las órdenes precargadas a la vez, con una sola búsqueda.
+        """
+        attachments = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', 'sale.order'),
+            ('res_field', '=', 'contract_signature'),
+            ('res_id', 'in', self.ids),
+        ])
+        checksums = {attachment.res_id: attachment.checksum for attachment in attachments}
+        for order in self:
+            order.contract_signature_checksum = checksums.get(order.id, False)
+
+    def _get_contract_report_hash(self):
+        """
+        Hash del contenido del contrato: campos de seguro, líneas de la orden,
+        cuotas, firma, datos del cliente y de la compañía y versión de las
+        plantillas. Identifica la versión del PDF cacheado.
+        Las relaciones y el checksum de la firma se leen en bloque para todas
+        las órdenes que se imprimen juntas.
+        """
+        self.ensure_one()
+        partner = self.partner_id
+        company_partner = partner.parent_id or partner
+        content = [
+            [self[field_name] for field_name in CONTRACT_REPORT_FIELDS],
+            # Cliente, contactos, representantes y sedes que imprime la plantilla
+            [(p.id, p.write_date) for p in partner | company_partner | partner.child_ids | company_partner.child_ids],
+            (self.company_id.write_date, self.company_id.partner_id.write_date),
+            self._get_contract_report_template_version(),
+            [(line.product_id.id, line.name, line.product_uom_qty, line.price_unit, line.price_subtotal)
+             for line in self.order_line],
+            [(line.installment_number, line.due_date, line.amount, line.interest_rate, line.discount_rate)
+             for line in self.payment_schedule_lines],
+            self.contract_signature_checksum,
+        ]
+        return hashlib.sha1(repr(content).encode()).hexdigest()
+
+    @api.model
+    @tools.ormcache(cache='templates')
+    def _get_contract_report_template_version(self):
+        """
+        Última modificación de las vistas del reporte del contrato. Se invalida
+        junto con el cache de plantillas al modificar cualquier vista.
+        """
+        views = self.env['ir.ui.view'].sudo().search_read([
+            '|', ('key', '=like', 'insurance_api.%'), ('key', 'in', CONTRACT_REPORT_TEMPLATE_KEYS),
+        ], ['write_date'])
+        return max((view['write_date'] for view in views), default=False)
+
+    def _get_contract_report_data(self):
+        """
+        Datos que usan las plantillas del contrato, precargados para todas las
+        órdenes de self de una vez. Devuelve un dict {order_id: valores}.
+        """
+        # Precarga en bloque de las relaciones que recorren las plantillas
+        self.payment_schedule_lines.mapped('amount')
+        self.order_line.mapped('display_type')
+        partners = self.partner_id | self.partner_id.parent_id
+        partners.child_ids.mapped('type')
+        partners.child_ids.category_id.mapped('name')
+
+        data = {}
+        for order in self:
+            partner = order.partner_id
+            company_partner = partner.parent_id or partner
+            data[order.id] = {
+                'schedule_lines': order.payment_schedule_lines.sorted(key=lambda l: (l.installment_number, l.id)),
+                'product_lines': order.order_line.filtered(lambda l: not l.display_type),
+                'partner_contacts': partner.child_ids,
+                'legal_representatives': partner.child_ids.filtered(
+                    lambda c: any(cat.name == 'Representante Legal' for cat in c.category_id)),
+                'company_partner': company_partner,
+                'locations': company_partner.child_ids.filtered(lambda c: c.type == 'other'),
+            }
+        return data
+
+    def get_contract_attachment_name(self):
+        """
+        Nombre del adjunto donde se guarda el PDF del contrato.
+        Incluye el hash del contenido, así el reporte reutiliza el PDF
+        mientras nada de lo impreso cambie.
+        """
+        self.ensure_one()
+        return f"{CONTRACT_REPORT_ATTACHMENT_PREFIX}{self.name} - {self._get_contract_report_hash()[:16]}.pdf"
+
+    def _invalidate_contract_report_cache(self):
+        """Elimina los PDF de contrato generados y guardados de estas órdenes"""
+        if not self.ids:
+            return
+        attachments = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', 'sale.order'),
+            ('res_id', 'in', self.ids),
+            ('res_field', '=', False),
+            ('mimetype', '=', 'application/pdf'),
+            ('name', '=like', f'{CONTRACT_REPORT_ATTACHMENT_PREFIX}%'),
+        ])
+        # Sólo los generados por get_contract_attachment_name, no los subidos a mano
+        names = {
+            order.id: re.compile(
+                rf'{re.escape(CONTRACT_REPORT_ATTACHMENT_PREFIX + order.name)} - [0-9a-f]{{16}}\.pdf')
+            for order in self
+        }
+        attachments.filtered(
+            lambda attachment: names[attachment.res_id].fullmatch(attachment.name)
+        ).unlink()
+
+    def action_print_contracts_batch(self):
+        """Imprime los contratos de las órdenes seleccionadas en segundo plano, por bloques"""
+        self._check_contract_requirements()
+        batch = self.env['sale.order.contract.print.batch'].create({
+            'order_ids': [(6, 0, self.ids)],
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'sale.order.contract.print.batch',
+            'res_id': batch.id,
+            'view_mode': 'form',
+            'views': [(False, 'form')],
+            'target': 'current',
+        }
+
     # Acción para enviar el email con el contrato
 
     def action_send_contract_email(self):
@@ -237,22 +599,24 @@ class InsuranceSaleOrder(models.Model):
         res = super(InsuranceSaleOrder, self).write(vals)
 
         if 'payment_term_id' in vals or 'amount_total' in vals:
-            for order in self:
-                order._generate_payment_schedule_lines()
+            self._regenerate_payment_schedules()
+
+        if set(vals) & set(CONTRACT_REPORT_FIELDS + ['order_line', 'payment_schedule_lines', 'contract_signature']):
+            self._invalidate_contract_report_cache()
 
         return res
 
-    @api.model
-    def create(self, vals):
-        """Override create para generar cronograma al crear la orden"""
-        order = super(InsuranceSaleOrder, self).create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create para generar cronograma al crear las órdenes"""
+        orders = super(InsuranceSaleOrder, self).create(vals_list)
 
-        if order.payment_term_id and order.amount_total > 0:
-            order._generate_payment_schedule_lines()
+        orders.filtered(lambda o: o.payment_term_id and o.amount_total > 0)._regenerate_payment_schedules()
 
-        return order
+        return orders
 
     @api.constrains('payment_schedule_lines')
+    @metrics.instrumented('sale.order._check_payment_schedule_total')
     def _check_payment_schedule_total(self):
         """
         Valida que el total de las cuotas coincida con el total esperado.
@@ -262,8 +626,8 @@ class InsuranceSaleOrder(models.Model):
             if not order.payment_schedule_lines or not order.payment_term_id:
                 continue
 
-            total_esperado = order.payment_schedule_lines[0]._calcular_total_esperado(order)
-            total_actual = sum(order.payment_schedule_lines.mapped('amount'))
+            total_esperado = order.payment_schedule_expected_total
+            total_actual = order.payment_schedule_total
             diferencia = abs(total_actual - total_esperado)
 
             if diferencia > 0.01:
@@ -280,6 +644,62 @@ class InsuranceSaleOrder(models.Model):
                         f"Faltante: ${total_esperado - total_actual:,.2f}"
                     )
 
+    def _get_payment_schedule_base_date(self):
+        """Fecha desde la que se calculan los vencimientos de las cuotas"""
+        self.ensure_one()
+        return self.date_order.date() if self.date_order else fields.Date.context_today(self)
+
+    def _get_payment_term_plans(self):
+        """
+        Cuotas de todos los términos de pago disponibles para la orden,
+        calculadas sobre el catálogo cacheado de la compañía.
+        Se cachea por (orden, monto total, versión del catálogo).
+        """
+        self.ensure_one()
+        catalog = self.env['account.payment.term']._get_portal_catalog(self.company_id.id)
+        # El catálogo se reconstruye al invalidarse, así que él mismo es su versión
+        key = (self.id, self.amount_total, catalog)
+
+        def compute_plans():
+            base_date = self._get_payment_schedule_base_date()
+            return tuple(
+                (term_id, term_name, installment_engine.compute_installments(
+                    term_lines, self.amount_total, self.currency_id.rounding, base_date))
+                for term_id, term_name, term_lines, _write_date in catalog
+            )
+
+        return installment_engine.get_plans(key, compute_plans)
+
+    def _get_catalog_installments(self, term_id):
+        """
+        Cuotas de un término del catálogo de la compañía para esta orden.
+        Devuelve None si el término no está disponible para la compañía.
+        """
+        self.ensure_one()
+        for catalog_term_id, term_name, installments in self._get_payment_term_plans():
+            if catalog_term_id == term_id:
+                return installments
+        return None
+
+    def _prepare_payment_schedule_lines_vals(self):
+        """Valores de las cuotas que corresponden al término de pago de la orden"""
+        self.ensure_one()
+        if not self.payment_term_id or self.amount_total <= 0:
+            return []
+
+        installments = self.payment_term_id._get_installments(
+            self.amount_total, self.currency_id, self._get_payment_schedule_base_date())
+        return [{
+            'installment_number': installment.installment_number,
+            'amount': installment.amount,
+            'due_date': installment.due_date,
+            'payment_status': 'pending',
+            'interest_rate': installment.interest_rate,
+            'discount_rate': installment.discount_rate,
+            'is_auto_generated': True,
+        } for installment in installments]
+
+    @metrics.instrumented('sale.order._generate_payment_schedule_lines')
     def _generate_payment_schedule_lines(self):
         """
         Genera o regenera las líneas de cronograma de pagos.
@@ -291,197 +711,145 @@ class InsuranceSaleOrder(models.Model):
         if not self.payment_term_id:
             return
 
-        commands = [(5, 0, 0)]
+        updates, vals_to_create, lines_to_delete = self.payment_schedule_lines._diff_schedule_lines(
+            self._prepare_payment_schedule_lines_vals())
+        commands = [(1, line.id, vals) for line, vals in updates]
+        commands += [(0, 0, vals) for vals in vals_to_create]
+        commands += [(2, line.id, 0) for line in lines_to_delete]
+        if commands:
+            self.payment_schedule_lines = commands
 
-        if self.payment_term_id and self.amount_total > 0:
-            # --- Calculation logic ---
-            installment_number = 1
-            amount = self.amount_total
-            result = []
-
-            base_date = self.date_order.date() if self.date_order else fields.Date.context_today(self)
-
-            for line in self.payment_term_id.line_ids.sorted(key=lambda r: r.installment_number):
-                if line.value == 'percent':
-                    amount_line = self.currency_id.round(self.amount_total * line.value_amount / 100)
-                    amount -= amount_line
-                    result.append((line, amount_line))
-                elif line.value == 'balance':
-                    result.append((line, self.currency_id.round(amount)))
-                elif line.value == 'fixed':
-                    amount -= line.value_amount
-                    result.append((line, line.value_amount))
-
-            from dateutil.relativedelta import relativedelta
-
-            for term_line, base_amount in result:
-
-                interest_factor = (1 + term_line.interest_rate / 100)
-                discount_factor = (1 - term_line.discount_rate / 100)
-                final_amount = base_amount * interest_factor * discount_factor
-
-                if term_line.due_date:
-
-                    due_date = term_line.due_date
-                else:
-
-                    if term_line.delay_type == 'days_after':
-                        due_date = base_date + relativedelta(days=term_line.nb_days)
-                    elif term_line.delay_type == 'days_after_end_of_month':
-                        due_date = base_date + relativedelta(day=31, days=term_line.nb_days)
-                    elif term_line.delay_type == 'days_after_end_of_next_month':
-                        due_date = base_date + relativedelta(months=1, day=31, days=term_line.nb_days)
-                    else:
-
-                        due_date = base_date + relativedelta(days=term_line.nb_days)
-
-                vals = {
-                    'installment_number': installment_number,
-                    'amount': self.currency_id.round(final_amount),
-                    'due_date': due_date,
-                    'payment_status': 'pending',
-                    'interest_rate': term_line.interest_rate,
-                    'discount_rate': term_line.discount_rate,
-                    'is_auto_generated': True,
-                }
-                commands.append((0, 0, vals))
-                installment_number += 1
-
-        self.payment_schedule_lines = commands
+    @metrics.instrumented('sale.order._regenerate_payment_schedules')
+    def _regenerate_payment_schedules(self):
+        """
+        Regenera en lote los cronogramas de las órdenes guardadas.
+        Las cuotas nuevas se comparan con las existentes por número de cuota:
+        se actualizan sólo las que cambian, se crean las que faltan y se
+        borran las que sobran, con un write por grupo de valores iguales,
+        un único create y un único unlink para todo el lote.
+        """
+        # Las órdenes sin término de pago mantienen sus cuotas manuales
+        orders = self.filtered('payment_term_id')
+        if not orders:
+            return
 
+        ScheduleLine = self.env['sale.order.payment.schedule.line']
+        line_ids_by_order = defaultdict(list)
+        for line in ScheduleLine.search([('order_id', 'in', orders.ids)]):
+            line_ids_by_order[line.order_id.id].append(line.id)
+
+        line_ids_by_vals = defaultdict(list)
+        vals_list = []
+        line_ids_to_delete = []
+        for order in orders:
+            lines = ScheduleLine.browse(line_ids_by_order[order.id])
+            updates, vals_to_create, extra_lines = lines._diff_schedule_lines(
+                order._prepare_payment_schedule_lines_vals())
+            for line, vals in updates:
+                line_ids_by_vals[tuple(sorted(vals.items()))].append(line.id)
+            for vals in vals_to_create:
+                vals['order_id'] = order.id
+                vals_list.append(vals)
+            line_ids_to_delete += extra_lines.ids
+
+        if line_ids_to_delete:
+            ScheduleLine.browse(line_ids_to_delete).unlink()
+        for vals, line_ids in line_ids_by_vals.items():
+            ScheduleLine.browse(line_ids).write(dict(vals))
+        if vals_list:
+            ScheduleLine.create(vals_list)
+
+    @metrics.instrumented('sale.order._create_invoices')
     def _create_invoices(self, grouped=False, final=False, date=None):
         """
         Override para agregar línea de intereses/descuentos financieros a la factura
         basado en la diferencia entre el total del pedido y el total del cronograma.
         """
         moves = super(InsuranceSaleOrder, self)._create_invoices(grouped=grouped, final=final, date=date)
-
-        for move in moves:
-            # Buscamos la orden de venta relacionada a esta factura
-            # Nota: invoice_origin es un char, puede ser confuso si hay agrupamiento, 
-            # pero _create_invoices standard vincula line_ids.sale_line_ids.order_id
-
-            related_orders = move.invoice_line_ids.mapped('sale_line_ids.order_id')
-
-            # Si hay múltiples órdenes agrupadas, la lógica de intereses se complica.
-            # Asumimos 1 factura = 1 orden para simplificar el cálculo financiero del módulo.
-            if len(related_orders) == 1:
-                order = related_orders[0]
-
-                # Calcular diferencia financiera
-                # Total esperado según cronograma (con intereses)
-                schedule_total = order.payment_schedule_total
-                # Total original de productos (sin intereses)
-                order_total = order.amount_total
-
-                diff = schedule_total - order_total
-
-                # Si la diferencia es significativa (> 0.01 o < -0.01)
-                if abs(diff) > 0.01:
-                    # Buscamos un producto para asignar la cuenta contable correcta
-                    # Intenta buscar "Interés Financiero" o crea una línea genérica
-
-                    product_name = "Interés Financiero" if diff > 0 else "Descuento Financiero"
-                    product = self.env['product.product'].search([('name', '=', product_name)], limit=1)
-
-                    line_vals = {
-                        'move_id': move.id,
-                        'name': f"Ajuste Financiero: {product_name}",
-                        'quantity': 1,
-                        'price_unit': diff,  # Puede ser negativo para descuentos
-                        'display_type': 'product',
-                    }
-
-                    if product:
-                        line_vals['product_id'] = product.id
-                        line_vals['tax_ids'] = [(6, 0, product.taxes_id.ids)]
-                        # La cuenta se obtiene automáticamente del producto al crear el move.line si se pasa product_id
-                    else:
-                        # Fallback: Usar cuenta de ingresos de la compañía si no hay producto
-                        # Esto es riesgoso si la compañía no tiene cuenta por defecto bien configurada
-                        journal = move.journal_id
-                        account = journal.default_account_id or self.env.company.account_journal_payment_debit_account_id
-                        if not account:
-                            # Intento final: buscar cualquier cuenta de ingresos
-                            account = self.env['account.account'].search([
-                                ('account_type', '=', 'income'),
-                                ('company_id', '=', self.env.company.id)
-                            ], limit=1)
-
-                        if account:
-                            line_vals['account_id'] = account.id
-
-                    # Crear la línea en la factura
-                    self.env['account.move.line'].create(line_vals)
-
+        self._create_financial_adjustment_lines(moves)
         return moves
 
-    def _create_invoices(self, grouped=False, final=False, date=None):
+    def _create_financial_adjustment_lines(self, moves):
         """
-        Override para agregar línea de intereses/descuentos financieros a la factura
-        basado en la diferencia entre el total del pedido y el total del cronograma.
+        Crea en un solo create las líneas de ajuste financiero de todas las facturas.
+        Los productos de interés/descuento y las cuentas de respaldo se resuelven
+        una vez por compañía. Si una factura agrupa varias órdenes, se agrega
+        una línea de ajuste por cada orden.
         """
-        moves = super(InsuranceSaleOrder, self)._create_invoices(grouped=grouped, final=final, date=date)
-
+        product_names = {'interest': "Interés Financiero", 'discount': "Descuento Financiero"}
+        companies = moves.company_id
+        products = self.env['product.product'].search([
+            ('name', 'in', list(product_names.values())),
+            ('company_id', 'in', [False] + companies.ids),
+        ])
+        # Precarga de impuestos de los productos encontrados
+        products.mapped('taxes_id')
+
+        products_by_company = {}
+        fallback_accounts = {}
+
+        def get_product(company, kind):
+            key = (company.id, kind)
+            if key not in products_by_company:
+                candidates = products.filtered(
+                    lambda p: p.name == product_names[kind] and (not p.company_id or p.company_id == company))
+                # Preferimos el producto propio de la compañía sobre el compartido
+                products_by_company[key] = candidates.sorted(lambda p: not p.company_id)[:1]
+            return products_by_company[key]
+
+        def get_fallback_account(move):
+            key = (move.company_id.id, move.journal_id.id)
+            if key not in fallback_accounts:
+                # Esto es riesgoso si la compañía no tiene cuenta por defecto bien configurada
+                account = move.journal_id.default_account_id or move.company_id.account_journal_payment_debit_account_id
+                if not account:
+                    # Intento final: buscar cualquier cuenta de ingresos
+                    account = self.env['account.account'].search([
+                        *self.env['account.account']._check_company_domain(move.company_id),
+                        ('account_type', '=', 'income'),
+                    ], limit=1)
+                fallback_accounts[key] = account
+            return fallback_accounts[key]
+
+        line_vals_list = []
         for move in moves:
-            # Buscamos la orden de venta relacionada a esta factura
-            # Nota: invoice_origin es un char, puede ser confuso si hay agrupamiento, 
-            # pero _create_invoices standard vincula line_ids.sale_line_ids.order_id
-
-            related_orders = move.invoice_line_ids.mapped('sale_line_ids.order_id')
-
-            # Si hay múltiples órdenes agrupadas, la lógica de intereses se complica.
-            # Asumimos 1 factura = 1 orden para simplificar el cálculo financiero del módulo.
-            if len(related_orders) == 1:
-                order = related_orders[0]
-
-                # Calcular diferencia financiera
-                # Total esperado según cronograma (con intereses)
-                schedule_total = order.payment_schedule_total
-                # Total original de productos (sin intereses)
-                order_total = order.amount_total
-
-                diff = schedule_total - order_total
-
-                # Si la diferencia es significativa (> 0.01 o < -0.01)
-                if abs(diff) > 0.01:
-                    # Buscamos un producto para asignar la cuenta contable correcta
-                    # Intenta buscar "Interés Financiero" o crea una línea genérica
-
-                    product_name = "Interés Financiero" if diff > 0 else "Descuento Financiero"
-                    product = self.env['product.product'].search([('name', '=', product_name)], limit=1)
-
-                    line_vals = {
-                        'move_id': move.id,
-                        'name': f"Ajuste Financiero: {product_name}",
-                        'quantity': 1,
-                        'price_unit': diff,  # Puede ser negativo para descuentos
-                        'display_type': 'product',
-                    }
-
-                    if product:
-                        line_vals['product_id'] = product.id
-                        line_vals['tax_ids'] = [(6, 0, product.taxes_id.ids)]
-                        # La cuenta se obtiene automáticamente del producto al crear el move.line si se pasa product_id
-                    else:
-                        # Fallback: Usar cuenta de ingresos de la compañía si no hay producto
-                        # Esto es riesgoso si la compañía no tiene cuenta por defecto bien configurada
-                        journal = move.journal_id
-                        account = journal.default_account_id or self.env.company.account_journal_payment_debit_account_id
-                        if not account:
-                            # Intento final: buscar cualquier cuenta de ingresos
-                            account = self.env['account.account'].search([
-                                ('account_type', '=', 'income'),
-                                ('company_id', '=', self.env.company.id)
-                            ], limit=1)
-
-                        if account:
-                            line_vals['account_id'] = account.id
-
-                    # Crear la línea en la factura
-                    self.env['account.move.line'].create(line_vals)
+            related_orders = move.invoice_line_ids.sale_line_ids.order_id
+            for order in related_orders:
+                # Órdenes sin cronograma no tienen ajuste financiero
+                if not order.payment_schedule_lines:
+                    continue
+
+                # Total esperado según cronograma (con intereses) menos total original de productos
+                diff = order.payment_schedule_total - order.amount_total
+                if abs(diff) <= 0.01:
+                    continue
+
+                kind = 'interest' if diff > 0 else 'discount'
+                name = f"Ajuste Financiero: {product_names[kind]}"
+                if len(related_orders) > 1:
+                    name += f" ({order.name})"
+                line_vals = {
+                    'move_id': move.id,
+                    'name': name,
+                    'quantity': 1,
+                    'price_unit': diff,  # Puede ser negativo para descuentos
+                    'display_type': 'product',
+                }
 
-        return moves
+                product = get_product(move.company_id, kind)
+                if product:
+                    # La cuenta se obtiene automáticamente del producto al crear el move.line
+                    line_vals['product_id'] = product.id
+                    line_vals['tax_ids'] = [(6, 0, product.taxes_id.ids)]
+                else:
+                    account = get_fallback_account(move)
+                    if account:
+                        line_vals['account_id'] = account.id
+
+                line_vals_list.append(line_vals)
+
+        if line_vals_list:
+            self.env['account.move.line'].create(line_vals_list)
 
 
 class SaleOrderPaymentScheduleLine(models.Model):
@@ -489,7 +857,7 @@ class SaleOrderPaymentScheduleLine(models.Model):
     _description = 'Línea de Cronograma de Pagos'
     _order = 'installment_number'
 
-    order_id = fields.Many2one('sale.order', string="Orden de Venta", required=True, ondelete='cascade')
+    order_id = fields.Many2one('sale.order', string="Orden de Venta", required=True, ondelete='cascade', index=True)
     installment_number = fields.Integer(string="Número de Cuota", required=True)
     amount = fields.Float(string="Monto", required=True, digits=(16, 2))
     due_date = fields.Date(string="Fecha de Vencimiento", help="Fecha en la que vence esta cuota")
@@ -499,11 +867,45 @@ class SaleOrderPaymentScheduleLine(models.Model):
         ('overdue', 'Vencido')
     ], string="Estado de Pago", default='pending')
     notes = fields.Text(string="Notas")
+    amount_paid = fields.Float(string="Monto Pagado", digits=(16, 2), default=0.0, copy=False,
+                               help="Monto imputado a esta cuota desde los pagos del cliente")
     currency_id = fields.Many2one('res.currency', related='order_id.currency_id', readonly=True)
     interest_rate = fields.Float(string='Tasa de Interés (%)', digits='Discount', default=0.0)
     discount_rate = fields.Float(string='Tasa de Descuento (%)', digits='Discount', default=0.0)
     is_auto_generated = fields.Boolean(string="Es Auto Generado", default=False, store=False)
 
+    def init(self):
+        # Índice para buscar cuotas por estado y vencimiento (cron de vencidas, reportes de cobranza)
+        tools.create_index(self._cr, 'sale_order_payment_schedule_line_status_due_date_index',
+                           self._table, ['payment_status', 'due_date'])
+
+    @api.model
+    def _cron_mark_overdue(self):
+        """
+        Marca como vencidas todas las cuotas pendientes cuya fecha ya pasó,
+        con un único UPDATE sobre la tabla.
+        """
+        today = fields.Date.context_today(self)
+        # El UPDATE debe ver los valores pendientes de escribir del ORM
+        self.flush_model(['payment_status', 'due_date'])
+        self.env.cr.execute("""
+            UPDATE sale_order_payment_schedule_line
+               SET payment_status = 'overdue',
+                   write_uid = %s,
+                   write_date = (now() at time zone 'UTC')
+             WHERE payment_status = 'pending'
+               AND due_date < %s
+         RETURNING id
+        """, [self.env.uid, today])
+        line_ids = [row[0] for row in self.env.cr.fetchall()]
+        if not line_ids:
+            return
+
+        # El UPDATE no pasa por el ORM: invalidamos la cache y avisamos a los campos dependientes
+        lines = self.browse(line_ids)
+        lines.invalidate_recordset(['payment_status', 'write_uid', 'write_date'])
+        lines.modified(['payment_status'])
+
     @api.onchange('amount', 'due_date', 'interest_rate', 'discount_rate')
     def _onchange_manual_edit(self):
         """Si se edita una cuota manualmente, desvinculamos el término de pago"""
@@ -515,61 +917,114 @@ class SaleOrderPaymentScheduleLine(models.Model):
 
     base_amount = fields.Float(
         string='Monto Base',
-        compute='_compute_base_amount',
+        compute='_compute_amount_breakdown',
         store=True,
         digits=(16, 2),
         help='Monto sin interés ni descuento'
     )
     interest_amount = fields.Float(
         string='Monto de Interés',
-        compute='_compute_interest_amount',
+        compute='_compute_amount_breakdown',
         store=True,
         digits=(16, 2),
         help='Monto adicional por interés'
     )
     discount_amount = fields.Float(
         string='Monto de Descuento',
-        compute='_compute_discount_amount',
+        compute='_compute_amount_breakdown',
         store=True,
         digits=(16, 2),
         help='Descuento aplicado'
     )
 
-    @api.depends('amount')
-    def _compute_base_amount(self):
-        """Calcula el monto base (sin interés ni descuento)"""
+    @api.depends('amount', 'interest_rate', 'discount_rate')
+    def _compute_amount_breakdown(self):
+        """Calcula en una sola pasada el monto base, el interés y el descuento de la cuota"""
         for line in self:
-            if line.interest_rate or line.discount_rate:
-                interest_factor = (1 + line.interest_rate / 100)
-                discount_factor = (1 - line.discount_rate / 100)
-                line.base_amount = line.amount / (interest_factor * discount_factor) if (
-                                                                                                    interest_factor * discount_factor) > 0 else 0
-            else:
-                line.base_amount = line.amount
+            line.base_amount, line.interest_amount, line.discount_amount = installment_engine.amount_breakdown(
+                line.amount, line.interest_rate, line.discount_rate)
+
+    # Tasas con las que se calculó el monto actual en el formulario. No dependen de
+    # nada, así que no se recalculan al cambiar las tasas y viajan con el formulario.
+    onchange_interest_rate = fields.Float(compute='_compute_onchange_rates', readonly=False)
+    onchange_discount_rate = fields.Float(compute='_compute_onchange_rates', readonly=False)
+
+    @api.depends()
+    def _compute_onchange_rates(self):
+        for line in self:
+            line.onchange_interest_rate = line.interest_rate
+            line.onchange_discount_rate = line.discount_rate
 
     @api.onchange('interest_rate', 'discount_rate')
     def _onchange_rates(self):
         """Recalcula el monto cuando cambian las tasas, manteniendo el monto base."""
         for line in self:
-            # Usamos base_amount si existe, para recalcular amount
-            if line.base_amount:
+            # El monto base sale del monto actual (incluso editado a mano) con las tasas anteriores
+            base_amount = installment_engine.amount_breakdown(
+                line.amount, line.onchange_interest_rate, line.onchange_discount_rate)[0]
+            if base_amount:
                 interest_factor = (1 + line.interest_rate / 100)
                 discount_factor = (1 - line.discount_rate / 100)
                 line.amount = line.currency_id.round(
-                    line.base_amount * interest_factor * discount_factor) if line.currency_id else line.base_amount * interest_factor * discount_factor
+                    base_amount * interest_factor * discount_factor) if line.currency_id else base_amount * interest_factor * discount_factor
+            line.onchange_interest_rate = line.interest_rate
+            line.onchange_discount_rate = line.discount_rate
 
-    @api.depends('base_amount', 'interest_rate')
-    def _compute_interest_amount(self):
-        """Calcula el monto de interés"""
-        for line in self:
-            line.interest_amount = line.base_amount * (line.interest_rate / 100)
-
-    @api.depends('base_amount', 'discount_rate')
-    def _compute_discount_amount(self):
-        """Calcula el monto de descuento"""
-        for line in self:
-            amount_with_interest = line.base_amount * (1 + line.interest_rate / 100)
-            line.discount_amount = amount_with_interest * (line.discount_rate / 100)
+    @api.model
+    def _recompute_amount_breakdown_bulk(self, batch_size=100000):
+        """
+        Comando de mantenimiento: recalcula base_amount, interest_amount y
+        discount_amount de todas las cuotas por bloques de ids, leyendo las
+        columnas con SQL, calculando con NumPy (o en Python si no está
+        instalado) y escribiendo cada bloque con un único UPDATE.
+        Devuelve la cantidad de cuotas procesadas.
+        """
+        self.env.flush_all()
+        cr = self.env.cr
+        last_id = 0
+        processed = 0
+        while True:
+            cr.execute("""
+                SELECT id, amount, interest_rate, discount_rate
+                  FROM sale_order_payment_schedule_line
+                 WHERE id > %s
+              ORDER BY id
+                 LIMIT %s
+            """, [last_id, batch_size])
+            rows = cr.fetchall()
+            if not rows:
+                break
+
+            ids = [row[0] for row in rows]
+            if installment_engine.np is not None:
+                np = installment_engine.np
+                columns = np.array([[value or 0.0 for value in row[1:]] for row in rows], dtype=float)
+                base_amounts, interest_amounts, discount_amounts = (
+                    column.tolist() for column in installment_engine.amount_breakdown_arrays(
+                        columns[:, 0], columns[:, 1], columns[:, 2]))
+            else:
+                breakdowns = [
+                    [float_round(value, precision_digits=2) for value in installment_engine.amount_breakdown(
+                        row[1] or 0.0, row[2] or 0.0, row[3] or 0.0)]
+                    for row in rows
+                ]
+                base_amounts, interest_amounts, discount_amounts = (list(column) for column in zip(*breakdowns))
+
+            cr.execute("""
+                UPDATE sale_order_payment_schedule_line AS line
+                   SET base_amount = data.base_amount,
+                       interest_amount = data.interest_amount,
+                       discount_amount = data.discount_amount
+                  FROM unnest(%s::int[], %s::numeric[], %s::numeric[], %s::numeric[])
+                       AS data(id, base_amount, interest_amount, discount_amount)
+                 WHERE line.id = data.id
+            """, [ids, base_amounts, interest_amounts, discount_amounts])
+
+            processed += len(ids)
+            last_id = ids[-1]
+
+        self.invalidate_model(['base_amount', 'interest_amount', 'discount_amount'])
+        return processed
 
     @api.constrains('amount')
     def _check_amount_positive(self):
@@ -580,6 +1035,61 @@ class SaleOrderPaymentScheduleLine(models.Model):
                     f"La cuota #{line.installment_number} debe tener un monto mayor a cero."
                 )
 
+    @api.model
+    def _get_regenerated_payment_status(self, amount, due_date, amount_paid=0.0):
+        """Estado de una cuota regenerada: pagada si lo imputado la cubre, vencida según su fecha"""
+        if amount_paid > 0 and float_compare(amount_paid, amount, precision_digits=2) >= 0:
+            return 'paid'
+        if due_date and due_date < fields.Date.context_today(self):
+            return 'overdue'
+        return 'pending'
+
+    def _diff_schedule_lines(self, vals_list):
+        """
+        Compara las cuotas de self con vals_list por número de cuota.
+        Devuelve (updates, vals_to_create, lines_to_delete), donde updates es
+        una lista de (línea, valores que cambian).
+        El estado de pago de una cuota existente sólo se recalcula si cambian su
+        monto o su vencimiento; si no, se conserva (vencida, pagada a mano, etc.).
+        """
+        current = {}
+        lines_to_delete = self.browse()
+        for line in self.sorted(key=lambda r: (r.installment_number, r.id)):
+            if line.installment_number in current:
+                lines_to_delete |= line
+            else:
+                current[line.installment_number] = line
+
+        updates = []
+        vals_to_create = []
+        for vals in vals_list:
+            line = current.pop(vals['installment_number'], None)
+            if not line:
+                vals_to_create.append(dict(vals, payment_status=self._get_regenerated_payment_status(
+                    vals['amount'], vals.get('due_date'))))
+                continue
+            changed = {}
+            for field_name, value in vals.items():
+                if field_name in ('is_auto_generated', 'payment_status'):
+                    continue
+                if field_name == 'amount':
+                    if float_compare(line.amount, value, precision_digits=2):
+                        changed[field_name] = value
+                elif line[field_name] != value:
+                    changed[field_name] = value
+            if 'amount' in changed or 'due_date' in changed:
+                # Las cuotas con pagos imputados conservan lo pagado; el estado sale de lo pagado y el nuevo monto
+                payment_status = self._get_regenerated_payment_status(
+                    changed.get('amount', line.amount), changed.get('due_date', line.due_date), line.amount_paid)
+                if payment_status != line.payment_status:
+                    changed['payment_status'] = payment_status
+            if changed:
+                updates.append((line, changed))
+
+        for line in current.values():
+            lines_to_delete |= line
+        return updates, vals_to_create, lines_to_delete
+
     def _calcular_total_esperado(self, order):
         """
         Calcula el total esperado de las cuotas según el término de pago,
@@ -588,26 +1098,8 @@ class SaleOrderPaymentScheduleLine(models.Model):
         if not order.payment_term_id or order.amount_total <= 0:
             return order.amount_total
 
-        payment_term = order.payment_term_id
-        amount = order.amount_total
-        result = []
-
-        for term_line in payment_term.line_ids.sorted(key=lambda r: r.installment_number):
-            if term_line.value == 'percent':
-                amount_line = order.currency_id.round(order.amount_total * term_line.value_amount / 100)
-                amount -= amount_line
-                result.append((term_line, amount_line))
-            elif term_line.value == 'balance':
-                result.append((term_line, order.currency_id.round(amount)))
-            elif term_line.value == 'fixed':
-                amount -= term_line.value_amount
-                result.append((term_line, term_line.value_amount))
-
-        total_esperado = 0
-        for term_line, base_amount in result:
-            interest_factor = (1 + term_line.interest_rate / 100)
-            discount_factor = (1 - term_line.discount_rate / 100)
-            final_amount = base_amount * interest_factor * discount_factor
-            total_esperado += order.currency_id.round(final_amount)
+        installments = order.payment_term_id._get_installments(
+            order.amount_total, order.currency_id, order._get_payment_schedule_base_date())
+        total_esperado = sum(installment.amount for installment in installments)
 
         return total_esperado
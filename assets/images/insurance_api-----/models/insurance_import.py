@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from odoo import _, api, models
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import float_compare
+
+_logger = logging.getLogger(__name__)
+
+# Campos de la orden que se aceptan en la importación
+INSURANCE_IMPORT_FIELDS = {
+    'partner_id', 'company_id', 'date_order', 'payment_term_id', 'client_order_ref',
+    'policy_number', 'school_year', 'insurer', 'insured_amount', 'events_limit', 'in_itinere_limit',
+    'events_max_quantity', 'in_itinere_max_quantity', 'emergencies', 'contract_start_date',
+    'contract_end_date', 'assistance_limit', 'in_itinere_plural_limit', 'show_insurance_table',
+    'legal_representative_name', 'legal_representative_dni',
+}
+INSURANCE_IMPORT_LINE_FIELDS = {'product_id', 'name', 'product_uom_qty', 'price_unit'}
+INSURANCE_IMPORT_SCHEDULE_FIELDS = {'installment_number', 'due_date', 'amount', 'interest_rate', 'discount_rate', 'notes'}
+
+
+class InsuranceSaleOrderImport(models.Model):
+    _inherit = 'sale.order'
+
+    def _check_insurance_import_schedules(self):
+        """
+        Valida los cronogramas de las órdenes importadas, una vez por lote:
+        los generados por término deben sumar el total esperado y los manuales,
+        sin interés ni descuento (monto base), el total de la orden.
+        """
+        self._check_payment_schedule_total()
+        for order in self:
+            lines = order.payment_schedule_lines
+            if order.payment_term_id or not lines:
+                continue
+            base_total = sum(lines.mapped('base_amount'))
+            # Cada monto base se redondea por separado: se tolera un centavo por cuota
+            tolerance = order.currency_id.rounding * len(lines)
+            if float_compare(abs(base_total - order.amount_total), tolerance,
+                             precision_rounding=order.currency_id.rounding) > 0:
+                raise ValidationError(_(
+                    "Las cuotas de %(order)s suman %(schedule)s sin interés ni descuento "
+                    "y el total de la orden es %(total)s.",
+                    order=order.name, schedule=base_total, total=order.amount_total))
+
+    @api.model
+    def _prepare_insurance_import_vals(self, row):
+        """
+        Valida una fila de importación y la convierte en valores de create.
+        Cada fila lleva los campos de la orden, 'order_line' (lista de dicts) y
+        opcionalmente 'payment_schedule' (lista de dicts) para un plan manual.
+        """
+        unknown = set(row) - INSURANCE_IMPORT_FIELDS - {'order_line', 'payment_schedule'}
+        if unknown:
+            raise UserError(_("Campos desconocidos: %s", ", ".join(sorted(unknown))))
+        if not row.get('partner_id'):
+            raise UserError(_("Falta el cliente (partner_id)."))
+        if not row.get('policy_number'):
+            raise UserError(_("Falta el número de póliza (policy_number)."))
+        if not row.get('order_line'):
+            raise UserError(_("La orden debe tener al menos una línea (order_line)."))
+        if row.get('payment_term_id') and row.get('payment_schedule'):
+            raise UserError(_("Indique un término de pago o un cronograma manual, no ambos."))
+
+        vals = {field_name: value for field_name, value in row.items() if field_name in INSURANCE_IMPORT_FIELDS}
+        order_lines = []
+        for line in row['order_line']:
+            unknown = set(line) - INSURANCE_IMPORT_LINE_FIELDS
+            if unknown:
+                raise UserError(_("Campos de línea desconocidos: %s", ", ".join(sorted(unknown))))
+            if not line.get('product_id'):
+                raise UserError(_("Cada línea debe indicar el producto (product_id)."))
+            order_lines.append((0, 0, line))
+        vals['order_line'] = order_lines
+
+        schedule_lines = []
+        for number, installment in enumerate(row.get('payment_schedule') or [], start=1):
+            unknown = set(installment) - INSURANCE_IMPORT_SCHEDULE_FIELDS
+            if unknown:
+                raise UserError(_("Campos de cuota desconocidos: %s", ", ".join(sorted(unknown))))
+            amount = installment.get('amount')
+            if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+                raise UserError(_("El monto de la cuota #%s debe ser un número.", number))
+            if amount <= 0:
+                raise UserError(_("La cuota #%s debe tener un monto mayor a cero.", number))
+            schedule_lines.append((0, 0, dict(installment, installment_number=installment.get('installment_number', number))))
+        if schedule_lines:
+            vals['payment_schedule_lines'] = schedule_lines
+            # Sin término: si no, se calcula el del cliente y regenera las cuotas sobre el plan manual
+            vals['payment_term_id'] = False
+        return vals
+
+    @api.model
+    def import_insurance_orders(self, rows, batch_size=500):
+        """
+        Importa pólizas en lote. Valida las filas, crea las órdenes y sus
+        cronogramas con un create por lote y verifica los totales de las cuotas
+        una sola vez al final de cada lote. Si un lote falla por cualquier
+        motivo (datos inválidos, claves foráneas, totales), sus filas se
+        reintentan de a una para informar el error de cada fila.
+        Devuelve una lista con el resultado de cada fila, en el mismo orden.
+        """
+        results = [None] * len(rows)
+        SaleOrder = self.with_context(tracking_disable=True)
+
+        for start in range(0, len(rows), batch_size):
+            batch = []
+            for index in range(start, min(start + batch_size, len(rows))):
+                try:
+                    batch.append((index, SaleOrder._prepare_insurance_import_vals(rows[index])))
+                except Exception as e:
+                    results[index] = {'row': index, 'success': False, 'error': str(e)}
+            if not batch:
+                continue
+
+            try:
+                with self.env.cr.savepoint():
+                    orders = SaleOrder.create([vals for _index, vals in batch])
+                    orders._check_insurance_import_schedules()
+            except Exception as e:
+                _logger.info("Importación de pólizas: el lote desde la fila %s falló (%s), se reintenta por fila", start, e)
+                orders = None
+
+            if orders is not None:
+                for (index, _vals), order in zip(batch, orders):
+                    results[index] = {'row': index, 'success': True, 'id': order.id, 'name': order.name}
+                continue
+
+            for index, vals in batch:
+                try:
+                    with self.env.cr.savepoint():
+                        order = SaleOrder.create(vals)
+                        order._check_insurance_import_schedules()
+                    results[index] = {'row': index, 'success': True, 'id': order.id, 'name': order.name}
+                except Exception as e:
+                    results[index] = {'row': index, 'success': False, 'error': str(e)}
+
+        return results
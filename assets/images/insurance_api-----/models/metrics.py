@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentación opcional de los caminos críticos del módulo.
+
+Se activa con la opción insurance_api_metrics = True del archivo de
+configuración de Odoo (o la variable de entorno INSURANCE_API_METRICS=1).
+Desactivada, cada llamada instrumentada sólo paga la verificación de un booleano.
+"""
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from odoo.tools import config
+
+ENABLED = bool(config.get('insurance_api_metrics') or os.environ.get('INSURANCE_API_METRICS'))
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+METRICS = (
+    ('insurance_api_call_seconds', 'Tiempo de reloj por llamada', SECONDS_BUCKETS),
+    ('insurance_api_sql_seconds', 'Tiempo de SQL por llamada', SECONDS_BUCKETS),
+    ('insurance_api_sql_queries', 'Consultas SQL por llamada', QUERY_BUCKETS),
+)
+
+
+class Histogram:
+    """Histograma acumulativo con buckets fijos, como los de Prometheus"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+def _sql_stats(cr):
+    """Cantidad y tiempo de consultas acumulados del thread (o del cursor si no hay)"""
+    thread = threading.current_thread()
+    if hasattr(thread, 'query_count'):
+        return thread.query_count, getattr(thread, 'query_time', 0.0)
+    return (cr.sql_log_count if cr is not None else 0), 0.0
+
+
+def _get_cursor(args):
+    records = args[0] if args else None
+    env = getattr(records, 'env', None)
+    if env is None:
+        from odoo.http import request
+        env = getattr(request, 'env', None) if request else None
+    return env.cr if env is not None else None
+
+
+def observe(name, seconds, sql_seconds, queries):
+    with _lock:
+        if name not in _histograms:
+            _histograms[name] = tuple(Histogram(buckets) for _metric, _help, buckets in METRICS)
+        for histogram, value in zip(_histograms[name], (seconds, sql_seconds, queries)):
+            histogram.observe(value)
+
+
+def instrumented(name):
+    """Decorador que registra tiempo total, tiempo de SQL y cantidad de consultas de cada llamada"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            cr = _get_cursor(args)
+            queries_before, sql_time_before = _sql_stats(cr)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                queries_after, sql_time_after = _sql_stats(cr)
+                observe(name, elapsed, sql_time_after - sql_time_before, queries_after - queries_before)
+        return wrapper
+    return decorator
+
+
+def render_prometheus():
+    """Exporta los histogramas en el formato de texto de Prometheus"""
+    with _lock:
+        snapshot = {
+            name: tuple((list(h.counts), h.sum, h.count) for h in histograms)
+            for name, histograms in _histograms.items()
+        }
+
+    lines = []
+    for index, (metric, help_text, buckets) in enumerate(METRICS):
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} histogram')
+        for name in sorted(snapshot):
+            counts, total, count = snapshot[name][index]
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{path="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{path="{name}",le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{path="{name}"}} {total}')
+            lines.append(f'{metric}_count{{path="{name}"}} {count}')
+    return '\n'.join(lines) + '\n'
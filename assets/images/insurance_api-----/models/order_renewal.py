@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Parámetros del seguro (copy=False) que se trasladan a la orden renovada
+RENEWAL_INSURANCE_FIELDS = [
+    'policy_number', 'insurer', 'insured_amount', 'events_limit', 'in_itinere_limit', 'events_max_quantity',
+    'in_itinere_max_quantity', 'assistance_limit', 'in_itinere_plural_limit', 'show_insurance_table',
+]
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    renewal_source_id = fields.Many2one('sale.order', string="Renovación de", copy=False, readonly=True,
+                                        index='btree_not_null', ondelete='set null')
+    renewal_batch_id = fields.Many2one('sale.order.renewal.batch', string="Lote de Renovación", copy=False,
+                                       readonly=True, index='btree_not_null', ondelete='set null')
+
+    def action_renew_orders(self):
+        """Abre un lote de renovación con las órdenes seleccionadas"""
+        batch = self.env['sale.order.renewal.batch'].create({
+            'order_ids': [(6, 0, self.ids)],
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'sale.order.renewal.batch',
+            'res_id': batch.id,
+            'view_mode': 'form',
+            'views': [(False, 'form')],
+            'target': 'current',
+        }
+
+
+class SaleOrderRenewalBatch(models.Model):
+    _name = 'sale.order.renewal.batch'
+    _description = 'Renovación de Pólizas en Lote'
+    _order = 'id desc'
+
+    name = fields.Char(string="Nombre", required=True, default=lambda self: _("Renovación %s", fields.Date.context_today(self)))
+    school_year = fields.Char(string="Nuevo Período Lectivo")
+    order_ids = fields.Many2many('sale.order', 'sale_order_renewal_batch_source_rel', 'batch_id', 'order_id',
+                                 string="Órdenes a Renovar", required=True)
+    renewed_order_ids = fields.One2many('sale.order', 'renewal_batch_id', string="Órdenes Renovadas", readonly=True)
+    carry_insurance_parameters = fields.Boolean(string="Trasladar Parámetros del Seguro", default=True)
+    carry_legal_representative = fields.Boolean(string="Trasladar Representante Legal", default=True)
+    carry_payment_term = fields.Boolean(string="Trasladar Término de Pago", default=True)
+    shift_contract_dates = fields.Boolean(string="Correr Fechas del Contrato un Año", default=True)
+    chunk_size = fields.Integer(string="Órdenes por Bloque", default=200,
+                                help="Cantidad de órdenes que se renuevan juntas en cada paso del proceso")
+    processed_count = fields.Integer(string="Órdenes Procesadas", default=0, readonly=True)
+    renewed_count = fields.Integer(string="Órdenes Renovadas", default=0, readonly=True)
+    order_count = fields.Integer(string="Cantidad de Órdenes", compute='_compute_progress')
+    progress = fields.Float(string="Progreso (%)", compute='_compute_progress')
+    state = fields.Selection([
+        ('draft', 'Borrador'),
+        ('pending', 'Pendiente'),
+        ('running', 'En Proceso'),
+        ('done', 'Terminado'),
+        ('failed', 'Error'),
+    ], string="Estado", default='draft', readonly=True)
+    error_message = fields.Text(string="Error", readonly=True)
+
+    @api.depends('order_ids', 'processed_count')
+    def _compute_progress(self):
+        for batch in self:
+            batch.order_count = len(batch.order_ids)
+            batch.progress = 100.0 * batch.processed_count / batch.order_count if batch.order_count else 0.0
+
+    def action_start(self):
+        """Encola el lote para que el cron lo procese en segundo plano"""
+        for batch in self:
+            if not batch.school_year:
+                raise UserError(_("Indique el nuevo período lectivo del lote %s.", batch.name))
+        self.filtered(lambda b: b.state == 'draft').write({'state': 'pending'})
+        self.env.ref('insurance_api.ir_cron_order_renewal_batch')._trigger()
+
+    def action_retry(self):
+        """Reintenta un lote con error desde el último bloque procesado"""
+        self.filtered(lambda b: b.state == 'failed').write({'state': 'pending', 'error_message': False})
+        self.env.ref('insurance_api.ir_cron_order_renewal_batch')._trigger()
+
+    def _get_next_chunk(self):
+        self.ensure_one()
+        orders = self.order_ids.sorted('id')
+        return orders[self.processed_count:self.processed_count + max(self.chunk_size, 1)]
+
+    def _prepare_renewal_vals_list(self, orders):
+        """
+        Valores de las órdenes renovadas: la copia estándar de cada orden más los
+        parámetros elegidos del lote, en el nuevo período lectivo.
+        """
+        self.ensure_one()
+        vals_list = orders.copy_data()
+        for order, vals in zip(orders, vals_list):
+            vals.update({
+                'school_year': self.school_year,
+                'renewal_source_id': order.id,
+                'renewal_batch_id': self.id,
+            })
+            if self.carry_insurance_parameters:
+                vals.update({field_name: order[field_name] for field_name in RENEWAL_INSURANCE_FIELDS})
+            if not self.carry_legal_representative:
+                vals.update({'legal_representative_name': False, 'legal_representative_dni': False})
+            if not self.carry_payment_term:
+                vals['payment_term_id'] = False
+            if self.shift_contract_dates:
+                vals.update({
+                    field_name: order[field_name] + relativedelta(years=1)
+                    for field_name in ('contract_start_date', 'contract_end_date') if order[field_name]
+                })
+        return vals_list
+
+    def _process_next_chunk(self):
+        """
+        Renueva el siguiente bloque de órdenes con un único create, que genera
+        también los cronogramas en lote. Las órdenes que ya tienen una renovación
+        en el período se saltean, así un bloque reintentado no las duplica.
+        """
+        self.ensure_one()
+        chunk = self._get_next_chunk()
+        if not chunk:
+            self.state = 'done'
+            return
+
+        already_renewed = self.env['sale.order'].search([
+            ('renewal_source_id', 'in', chunk.ids),
+            ('school_year', '=', self.school_year),
+        ]).renewal_source_id
+        orders = chunk - already_renewed
+        if orders:
+            self.env['sale.order'].with_context(tracking_disable=True, mail_create_nolog=True).create(
+                self._prepare_renewal_vals_list(orders))
+
+        self.processed_count += len(chunk)
+        self.renewed_count += len(orders)
+        self.state = 'done' if self.processed_count >= len(self.order_ids) else 'running'
+
+    @api.model
+    def _cron_process_batches(self):
+        """
+        Procesa un bloque de cada lote pendiente e informa el avance al cron,
+        que confirma la transacción y vuelve a ejecutarse mientras quede trabajo.
+        """
+        batches = self.search([('state', 'in', ('pending', 'running'))])
+        for batch in batches:
+            try:
+                with self.env.cr.savepoint():
+                    batch._process_next_chunk()
+            except Exception as e:
+                _logger.exception("Error al renovar el lote de órdenes %s", batch.id)
+                batch.write({'state': 'failed', 'error_message': str(e)})
+
+        remaining = sum(
+            batch.order_count - batch.processed_count
+            for batch in batches if batch.state in ('pending', 'running')
+        )
+        self.env['ir.cron']._notify_progress(done=len(batches), remaining=remaining)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.tools import float_compare
+
+PAYMENT_MATCHING_WATERMARK = 'insurance_api.payment_matching_watermark'
+# write_date es la hora de inicio de la transacción: un pago confirmado en una transacción
+# larga puede quedar con fecha anterior a la marca. Se revisa este margen hacia atrás;
+# schedule_applied evita imputarlos dos veces.
+PAYMENT_MATCHING_OVERLAP = timedelta(minutes=10)
+
+
+class AccountPayment(models.Model):
+    _inherit = 'account.payment'
+
+    schedule_applied = fields.Boolean(
+        string="Aplicado a Cuotas", default=False, copy=False, readonly=True,
+        help="Indica que el pago ya se imputó a las cuotas de los cronogramas de pago del cliente")
+
+    @api.model
+    def _get_schedule_matching_domain(self, watermark):
+        domain = [
+            ('payment_type', '=', 'inbound'),
+            ('partner_type', '=', 'customer'),
+            ('state', 'in', ('in_process', 'paid')),
+            ('schedule_applied', '=', False),
+            ('partner_id', '!=', False),
+        ]
+        if watermark:
+            since = fields.Datetime.to_datetime(watermark) - PAYMENT_MATCHING_OVERLAP
+            domain.append(('write_date', '>=', fields.Datetime.to_string(since)))
+        return domain
+
+    @api.model
+    def _cron_match_schedule_payments(self, batch_size=1000):
+        """
+        Imputa los pagos de clientes confirmados desde la última ejecución a las
+        cuotas abiertas, en orden de número de cuota, agrupando por cliente.
+        La marca de agua (write_date del último pago procesado) se guarda en
+        un parámetro del sistema para procesar sólo pagos nuevos, con un
+        margen hacia atrás para los confirmados en transacciones largas.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        watermark = ICP.get_param(PAYMENT_MATCHING_WATERMARK)
+
+        payments = self.search(self._get_schedule_matching_domain(watermark),
+                               order='write_date, id', limit=batch_size)
+        if not payments:
+            return
+
+        # La marca se toma antes de escribir, porque el write actualiza write_date
+        new_watermark = fields.Datetime.to_string(payments[-1].write_date)
+        payments._apply_to_payment_schedules()
+        payments.write({'schedule_applied': True})
+        ICP.set_param(PAYMENT_MATCHING_WATERMARK, new_watermark)
+
+        remaining = self.search_count(self._get_schedule_matching_domain(watermark))
+        self.env['ir.cron']._notify_progress(done=len(payments), remaining=remaining)
+
+    def _apply_to_payment_schedules(self):
+        """Distribuye el monto de los pagos sobre las cuotas abiertas de cada cliente"""
+        payments_by_partner = defaultdict(lambda: self.browse())
+        for payment in self:
+            payments_by_partner[payment.partner_id.commercial_partner_id] |= payment
+
+        partners = self.env['res.partner'].concat(*payments_by_partner)
+        open_lines = self.env['sale.order.payment.schedule.line'].search([
+            ('order_id.partner_id', 'child_of', partners.ids),
+            ('order_id.state', '=', 'sale'),
+            ('payment_status', 'in', ('pending', 'overdue')),
+        ])
+        lines_by_partner = defaultdict(list)
+        for line in open_lines.sorted(key=lambda l: (l.order_id.date_order, l.order_id.id, l.installment_number)):
+            lines_by_partner[line.order_id.partner_id.commercial_partner_id].append(line)
+
+        for partner, partner_payments in payments_by_partner.items():
+            lines = lines_by_partner[partner]
+            for payment in partner_payments.sorted(key=lambda p: (p.date, p.id)):
+                available = payment.amount
+                while lines and float_compare(available, 0, precision_rounding=payment.currency_id.rounding) > 0:
+                    line = lines[0]
+                    order = line.order_id
+                    residual = line.amount - line.amount_paid
+                    if float_compare(residual, 0, precision_digits=2) <= 0:
+                        # Cuota ya cubierta (por ejemplo, regenerada con un monto menor): se cierra sin imputar
+                        lines.pop(0)
+                        line.payment_status = 'paid'
+                        continue
+                    amount = payment.currency_id._convert(
+                        available, order.currency_id, order.company_id, payment.date)
+                    to_apply = max(min(amount, residual), 0.0)
+                    if float_compare(to_apply, 0, precision_digits=2) <= 0:
+                        break
+                    vals = {'amount_paid': line.amount_paid + to_apply}
+                    if float_compare(vals['amount_paid'], line.amount, precision_digits=2) >= 0:
+                        vals['payment_status'] = 'paid'
+                        lines.pop(0)
+                    line.write(vals)
+                    available -= order.currency_id._convert(
+                        to_apply, payment.currency_id, order.company_id, payment.date)
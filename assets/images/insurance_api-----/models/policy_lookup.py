@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+from odoo import _, api, fields, models, tools
+from odoo.exceptions import UserError
+
+# Campos que devuelve la API de consulta de pólizas
+POLICY_LOOKUP_FIELDS = [
+    'name', 'policy_number', 'school_year', 'insurer', 'partner_id', 'company_id', 'state',
+    'contract_start_date', 'contract_end_date', 'contract_signed_on', 'amount_total', 'payment_schedule_total',
+]
+POLICY_LOOKUP_MAX_LIMIT = 500
+# Largo mínimo de una búsqueda parcial, para que use el índice trigram
+POLICY_LOOKUP_MIN_PARTIAL = 3
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    def init(self):
+        super(SaleOrder, self).init()
+        # Búsqueda exacta por póliza (el índice trigram cubre las parciales)
+        tools.create_index(self._cr, 'sale_order_policy_number_index', self._table, ['policy_number'])
+        # Contratos por vencer: rango de fechas y paginación por (fecha de fin, id)
+        tools.create_index(self._cr, 'sale_order_contract_end_date_id_index', self._table,
+                           ['contract_end_date', 'id'], where='contract_end_date IS NOT NULL')
+
+    @api.model
+    def _policy_lookup_page(self, domain, order, limit, cursor_fields):
+        """
+        Lee una página de órdenes y el cursor de la siguiente.
+        Se pide un registro de más para saber si hay otra página.
+        """
+        limit = min(max(int(limit or 0), 1), POLICY_LOOKUP_MAX_LIMIT)
+        records = self.search_read(domain, POLICY_LOOKUP_FIELDS, order=order, limit=limit + 1)
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            next_cursor = [
+                fields.Date.to_string(records[-1][field_name]) if field_name == 'contract_end_date'
+                else records[-1][field_name]
+                for field_name in cursor_fields
+            ]
+        return {'records': records, 'next_cursor': next_cursor}
+
+    @api.model
+    def lookup_policies(self, policy_number, partial=False, limit=80, cursor=None):
+        """
+        Busca órdenes por número de póliza, exacto o parcial.
+        Pagina por id: cursor es el 'next_cursor' de la página anterior.
+        Devuelve {'records': [...], 'next_cursor': [id] o None}.
+        """
+        policy_number = (policy_number or '').strip()
+        if not policy_number:
+            raise UserError(_("Indique el número de póliza."))
+        if partial and len(policy_number) < POLICY_LOOKUP_MIN_PARTIAL:
+            raise UserError(_("La búsqueda parcial requiere al menos %s caracteres.", POLICY_LOOKUP_MIN_PARTIAL))
+
+        domain = [('policy_number', 'ilike' if partial else '=', policy_number)]
+        if cursor:
+            domain.append(('id', '>', int(cursor[0])))
+        return self._policy_lookup_page(domain, 'id', limit, ['id'])
+
+    @api.model
+    def search_expiring_contracts(self, date_from, date_to, school_year=None, limit=100, cursor=None):
+        """
+        Contratos cuya fecha de fin cae entre date_from y date_to, ordenados por
+        fecha de fin e id. Pagina por esas dos columnas (keyset): cursor es el
+        'next_cursor' [fecha, id] de la página anterior.
+        """
+        date_from = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to)
+        if not date_from or not date_to or date_from > date_to:
+            raise UserError(_("Indique un rango de fechas válido."))
+
+        domain = [('contract_end_date', '>=', date_from), ('contract_end_date', '<=', date_to)]
+        if school_year:
+            domain.append(('school_year', '=', school_year))
+        if cursor:
+            cursor_date, cursor_id = fields.Date.to_date(cursor[0]), int(cursor[1])
+            domain += ['|', ('contract_end_date', '>', cursor_date),
+                       '&', ('contract_end_date', '=', cursor_date), ('id', '>', cursor_id)]
+        return self._policy_lookup_page(domain, 'contract_end_date, id', limit, ['contract_end_date', 'id'])
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import contract_report
+from . import payment_schedule_report
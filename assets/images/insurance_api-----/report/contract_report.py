@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, models
+
+from ..models import metrics
+
+CONTRACT_REPORT_NAME = 'sale.report_saleorder_pro_forma'
+
+
+class ReportSaleOrderContract(models.AbstractModel):
+    """Agrega los datos del contrato al reporte de proforma (reemplazado por el contrato)"""
+    _inherit = 'report.sale.report_saleorder_pro_forma'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        values = super(ReportSaleOrderContract, self)._get_report_values(docids, data=data)
+        docs = values.get('docs') or self.env['sale.order'].browse(docids)
+        values['contract_data'] = docs._get_contract_report_data()
+        return values
+
+
+class IrActionsReport(models.Model):
+    _inherit = 'ir.actions.report'
+
+    def _render_qweb_pdf(self, report_ref, res_ids=None, data=None):
+        if metrics.ENABLED and self._get_report(report_ref).report_name == CONTRACT_REPORT_NAME:
+            return self._render_contract_pdf(report_ref, res_ids=res_ids, data=data)
+        return super(IrActionsReport, self)._render_qweb_pdf(report_ref, res_ids=res_ids, data=data)
+
+    @metrics.instrumented('report.contract_pdf')
+    def _render_contract_pdf(self, report_ref, res_ids=None, data=None):
+        return super(IrActionsReport, self)._render_qweb_pdf(report_ref, res_ids=res_ids, data=data)
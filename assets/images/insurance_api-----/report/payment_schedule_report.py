@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields, models, tools
+
+
+class PaymentScheduleReport(models.Model):
+    """
+    Flujo de fondos de las cuotas. Vista SQL de sólo lectura sobre las líneas de
+    cronograma: la agregación por mes, compañía, estado, aseguradora y período
+    lectivo la resuelve PostgreSQL en el pivot/gráfico.
+    """
+    _name = 'sale.order.payment.schedule.report'
+    _description = 'Análisis de Flujo de Fondos de Cuotas'
+    _auto = False
+    _rec_name = 'due_date'
+    _order = 'due_date desc'
+
+    due_date = fields.Date(string="Fecha de Vencimiento", readonly=True)
+    order_id = fields.Many2one('sale.order', string="Orden de Venta", readonly=True)
+    order_state = fields.Selection([
+        ('draft', 'Presupuesto'),
+        ('sent', 'Presupuesto Enviado'),
+        ('sale', 'Orden de Venta'),
+        ('cancel', 'Cancelada'),
+    ], string="Estado de la Orden", readonly=True)
+    partner_id = fields.Many2one('res.partner', string="Cliente", readonly=True)
+    company_id = fields.Many2one('res.company', string="Compañía", readonly=True)
+    currency_id = fields.Many2one('res.currency', string="Moneda", readonly=True)
+    payment_term_id = fields.Many2one('account.payment.term', string="Término de Pago", readonly=True)
+    insurer = fields.Char(string="Aseguradora", readonly=True)
+    school_year = fields.Char(string="Período Lectivo", readonly=True)
+    installment_number = fields.Integer(string="Número de Cuota", readonly=True, aggregator=False)
+    payment_status = fields.Selection([
+        ('pending', 'Pendiente'),
+        ('paid', 'Pagado'),
+        ('overdue', 'Vencido')
+    ], string="Estado de Pago", readonly=True)
+    line_count = fields.Integer(string="Cantidad de Cuotas", readonly=True)
+    amount = fields.Float(string="Monto", readonly=True, digits=(16, 2))
+    amount_paid = fields.Float(string="Monto Pagado", readonly=True, digits=(16, 2))
+    amount_residual = fields.Float(string="Monto a Cobrar", readonly=True, digits=(16, 2))
+    base_amount = fields.Float(string="Monto Base", readonly=True, digits=(16, 2))
+    interest_amount = fields.Float(string="Monto de Interés", readonly=True, digits=(16, 2))
+    discount_amount = fields.Float(string="Monto de Descuento", readonly=True, digits=(16, 2))
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(f"""
+            CREATE OR REPLACE VIEW {self._table} AS (
+                SELECT line.id AS id,
+                       line.due_date AS due_date,
+                       line.order_id AS order_id,
+                       so.state AS order_state,
+                       so.partner_id AS partner_id,
+                       so.company_id AS company_id,
+                       so.currency_id AS currency_id,
+                       so.payment_term_id AS payment_term_id,
+                       so.insurer AS insurer,
+                       so.school_year AS school_year,
+                       line.installment_number AS installment_number,
+                       line.payment_status AS payment_status,
+                       1 AS line_count,
+                       line.amount AS amount,
+                       COALESCE(line.amount_paid, 0.0) AS amount_paid,
+                       line.amount - COALESCE(line.amount_paid, 0.0) AS amount_residual,
+                       line.base_amount AS base_amount,
+                       line.interest_amount AS interest_amount,
+                       line.discount_amount AS discount_amount
+                  FROM sale_order_payment_schedule_line line
+                  JOIN sale_order so ON so.id = line.order_id
+            )
+        """)
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+from . import test_performance
+from . import test_portal
+from . import test_payment_matching
+from . import test_schedule_lines
+from . import test_insurance_import
+from . import test_contract_reminder
+from . import test_amount_words
+from . import test_rate_simulation
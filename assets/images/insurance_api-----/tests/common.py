@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon, AccountTestInvoicingHttpCommon
+
+
+class InsuranceApiCommonMixin:
+    """Datos sintéticos compartidos: términos de pago con cuotas y órdenes de seguro"""
+
+    @classmethod
+    def _setup_insurance_data(cls):
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.payment_term_3 = cls.env['account.payment.term'].create({
+            'name': "3 Cuotas con interés",
+            'line_ids': [
+                (0, 0, {'installment_number': 1, 'value': 'percent', 'value_amount': 40.0,
+                        'interest_rate': 5.0, 'nb_days': 0}),
+                (0, 0, {'installment_number': 2, 'value': 'percent', 'value_amount': 30.0,
+                        'interest_rate': 5.0, 'nb_days': 30}),
+                (0, 0, {'installment_number': 3, 'value': 'percent', 'value_amount': 30.0,
+                        'interest_rate': 5.0, 'nb_days': 60}),
+            ],
+        })
+        cls.payment_term_1 = cls.env['account.payment.term'].create({
+            'name': "Contado con descuento",
+            'line_ids': [
+                (0, 0, {'installment_number': 1, 'value': 'percent', 'value_amount': 100.0,
+                        'discount_rate': 10.0, 'nb_days': 0}),
+            ],
+        })
+
+    @classmethod
+    def _create_insurance_orders(cls, count, payment_term=None, price_unit=1000.0):
+        return cls.env['sale.order'].create([{
+            'partner_id': cls.partner_a.id,
+            'payment_term_id': (payment_term or cls.payment_term_3).id,
+            'policy_number': f"POL-{index:06d}",
+            'school_year': "2026",
+            'insured_amount': 1000000.0,
+            'legal_representative_dni': "20123456",
+            'order_line': [(0, 0, {
+                'product_id': cls.product_a.id,
+                'product_uom_qty': 1,
+                'price_unit': price_unit,
+                'tax_id': False,
+            })],
+        } for index in range(count)])
+
+
+class InsuranceApiCommon(InsuranceApiCommonMixin, AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._setup_insurance_data()
+
+
+class InsuranceApiHttpCommon(InsuranceApiCommonMixin, AccountTestInvoicingHttpCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._setup_insurance_data()
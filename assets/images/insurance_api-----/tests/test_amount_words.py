@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestAmountToWords(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.order = self.env['sale.order']
+
+    def test_cents(self):
+        self.assertEqual(self.order._amount_to_words(1500), "MIL QUINIENTOS PESOS")
+        self.assertTrue(self.order._amount_to_words(1500.5).endswith(" PESOS CON 50/100"))
+        self.assertTrue(self.order._amount_to_words(0.07).endswith(" PESOS CON 07/100"))
+
+    def test_half_cent_rounds_up(self):
+        # 1.005 se guarda como 1.00499999... en binario: debe redondear igual que float_round
+        self.assertTrue(self.order._amount_to_words(1.005).endswith(" CON 01/100"))
+        self.assertTrue(self.order._amount_to_words(2.675).endswith(" CON 68/100"))
+
+    def test_negative(self):
+        words = self.order._amount_to_words(-1500.5)
+        self.assertTrue(words.startswith("MENOS "))
+        self.assertEqual(words, "MENOS " + self.order._amount_to_words(1500.5))
+        self.assertTrue(self.order._amount_to_words(-0.005).startswith("MENOS "))
+
+    def test_empty_amount(self):
+        self.assertEqual(self.order._amount_to_words(False), self.order._amount_to_words(0))
+
+    def test_batch(self):
+        amounts = [1500, 1500.5, -2.25]
+        expected = [self.order._amount_to_words(amount) for amount in amounts]
+        self.assertEqual(self.order._amounts_to_words(amounts), expected)
+        self.assertEqual(
+            self.order._amounts_to_words({'total': 1500, 'cuota': 1500.5, 'ajuste': -2.25}),
+            dict(zip(['total', 'cuota', 'ajuste'], expected)),
+        )
+        self.assertEqual(self.order._amounts_to_words([]), [])
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import tagged
+
+from .common import InsuranceApiCommon
+
+
+@tagged('post_install', '-at_install')
+class TestContractReminder(InsuranceApiCommon):
+
+    def test_reminder_for_unsigned_contract(self):
+        self.partner_a.email = "cliente@example.com"
+        order = self._create_insurance_orders(1)
+        order.action_confirm()
+        self.assertFalse(order.contract_signed_on)
+
+        self.env['sale.order']._cron_send_contract_reminders()
+
+        mail = self.env['mail.mail'].search([('model', '=', 'sale.order'), ('res_id', '=', order.id)])
+        self.assertEqual(len(mail), 1)
+        self.assertEqual(mail.recipient_ids, self.partner_a)
+        self.assertIn(order.get_contract_portal_url(), mail.body_html)
+        self.assertTrue(order.contract_reminder_sent_on)
+
+        # Dentro del intervalo no se vuelve a enviar
+        self.env['sale.order']._cron_send_contract_reminders()
+        self.assertEqual(
+            self.env['mail.mail'].search_count([('model', '=', 'sale.order'), ('res_id', '=', order.id)]), 1)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+
+from .common import InsuranceApiCommon
+
+
+@tagged('post_install', '-at_install')
+class TestInsuranceImport(InsuranceApiCommon):
+
+    def _row(self, policy_number, **values):
+        row = {
+            'partner_id': self.partner_a.id,
+            'policy_number': policy_number,
+            'order_line': [{'product_id': self.product_a.id, 'product_uom_qty': 1, 'price_unit': 1000.0}],
+        }
+        row.update(values)
+        return row
+
+    def setUp(self):
+        super().setUp()
+        # Sin impuestos, el total de la orden es el precio de la línea
+        self.product_a.taxes_id = False
+
+    @mute_logger('odoo.sql_db', 'odoo.addons.insurance_api.models.insurance_import')
+    def test_import_reports_each_row(self):
+        rows = [
+            self._row("POL-1", payment_term_id=self.payment_term_3.id),
+            self._row("POL-2", partner_id=999999999),
+            self._row("POL-3", payment_schedule=[{'amount': "mucho"}]),
+            self._row("POL-4", payment_schedule=[{'amount': 400.0}, {'amount': 400.0}]),
+            self._row("POL-5", payment_schedule=[{'amount': True}]),
+        ]
+        results = self.env['sale.order'].import_insurance_orders(rows)
+
+        self.assertEqual([result['success'] for result in results], [True, False, False, False, False])
+        self.assertIn("número", results[2]['error'])
+        order = self.env['sale.order'].browse(results[0]['id'])
+        self.assertEqual(len(order.payment_schedule_lines), 3)
+        self.assertFalse(self.env['sale.order'].search([('policy_number', 'in', ["POL-2", "POL-3", "POL-4", "POL-5"])]))
+
+    def test_import_keeps_manual_schedule(self):
+        # Plan financiado: 2 cuotas de 525 con 5% de interés sobre una orden de 1000
+        self.partner_a.property_payment_term_id = self.payment_term_3
+        rows = [self._row("POL-6", payment_schedule=[
+            {'amount': 525.0, 'interest_rate': 5.0},
+            {'amount': 525.0, 'interest_rate': 5.0},
+        ])]
+        results = self.env['sale.order'].import_insurance_orders(rows)
+
+        self.assertTrue(results[0]['success'], results[0].get('error'))
+        order = self.env['sale.order'].browse(results[0]['id'])
+        self.assertFalse(order.payment_term_id)
+        self.assertEqual(order.payment_schedule_lines.mapped('amount'), [525.0, 525.0])
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import tagged
+
+from odoo.addons.insurance_api.models.payment_matching import PAYMENT_MATCHING_WATERMARK
+from .common import InsuranceApiCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPaymentMatching(InsuranceApiCommon):
+    """Imputación de pagos de clientes a las cuotas (420 + 315 + 315 con el término de 3 cuotas)"""
+
+    def setUp(self):
+        super().setUp()
+        self.order = self._create_insurance_orders(1)
+        self.order.action_confirm()
+        self.lines = self.order.payment_schedule_lines.sorted('installment_number')
+
+    def _post_payment(self, amount):
+        payment = self.env['account.payment'].create({
+            'payment_type': 'inbound',
+            'partner_type': 'customer',
+            'partner_id': self.partner_a.id,
+            'amount': amount,
+        })
+        payment.action_post()
+        return payment
+
+    def _pay(self, amount):
+        payment = self._post_payment(amount)
+        payment._apply_to_payment_schedules()
+        return payment
+
+    def assertLinesPaid(self, expected):
+        self.assertEqual(
+            [(line.amount_paid, line.payment_status) for line in self.lines],
+            expected,
+        )
+
+    def test_partial_payment(self):
+        self._pay(200.0)
+        self.assertLinesPaid([(200.0, 'pending'), (0.0, 'pending'), (0.0, 'pending')])
+
+    def test_full_payment(self):
+        self._pay(200.0)
+        self._pay(220.0)
+        self.assertLinesPaid([(420.0, 'paid'), (0.0, 'pending'), (0.0, 'pending')])
+
+    def test_payment_spanning_installments(self):
+        self._pay(920.0)
+        self.assertLinesPaid([(420.0, 'paid'), (315.0, 'paid'), (185.0, 'pending')])
+
+    def test_overpaid_line_does_not_inflate_payment(self):
+        # Una cuota reabierta con lo pagado por encima del monto no debe sumar crédito al pago
+        self.lines[0].write({'amount_paid': 500.0, 'payment_status': 'pending'})
+        self._pay(100.0)
+        self.assertLinesPaid([(500.0, 'paid'), (100.0, 'pending'), (0.0, 'pending')])
+
+    def test_regeneration_keeps_paid_status(self):
+        self._pay(420.0)
+        self.order._regenerate_payment_schedules()
+        self.assertLinesPaid([(420.0, 'paid'), (0.0, 'pending'), (0.0, 'pending')])
+
+    def test_cron_applies_payments_in_batches(self):
+        Payment = self.env['account.payment']
+        payments = self._post_payment(420.0) | self._post_payment(315.0)
+        pending = Payment.search_count(Payment._get_schedule_matching_domain(False))
+        for _i in range(pending):
+            Payment._cron_match_schedule_payments(batch_size=1)
+        self.assertEqual(payments.mapped('schedule_applied'), [True, True])
+        self.assertLinesPaid([(420.0, 'paid'), (315.0, 'paid'), (0.0, 'pending')])
+        self.assertTrue(self.env['ir.config_parameter'].sudo().get_param(PAYMENT_MATCHING_WATERMARK))
+        # Una nueva ejecución no vuelve a imputar los pagos aplicados
+        Payment._cron_match_schedule_payments()
+        self.assertLinesPaid([(420.0, 'paid'), (315.0, 'paid'), (0.0, 'pending')])
+
+    def test_cron_picks_up_payments_older_than_watermark(self):
+        # Pago confirmado en una transacción que empezó antes que la última ejecución
+        payment = self._post_payment(420.0)
+        payment.flush_recordset()
+        watermark = payment.write_date + timedelta(minutes=1)
+        self.env['ir.config_parameter'].sudo().set_param(
+            PAYMENT_MATCHING_WATERMARK, fields.Datetime.to_string(watermark))
+        self.env['account.payment']._cron_match_schedule_payments()
+        self.assertTrue(payment.schedule_applied)
+        self.assertLinesPaid([(420.0, 'paid'), (0.0, 'pending'), (0.0, 'pending')])
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from odoo import http
+from odoo.tests import tagged
+
+from odoo.addons.insurance_api.controllers import portal
+from .common import InsuranceApiCommon, InsuranceApiHttpCommon
+
+BENCHMARK_SCALES = (1, 100, 10000)
+# Cantidad máxima de llamadas HTTP por ruta del portal en cada escala
+BENCHMARK_PORTAL_SAMPLE = 50
+# PNG de 1x1 píxel usado como firma
+SIGNATURE_PNG = 'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=='
+
+
+@tagged('post_install', '-at_install')
+class TestInsuranceApiQueryCount(InsuranceApiCommon):
+    """
+    Cantidad de consultas de los caminos críticos. Los límites no deben
+    crecer con la cantidad de órdenes.
+    """
+
+    def _count_queries(self, func):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        start = self.env.cr.sql_log_count
+        func()
+        self.env.flush_all()
+        return self.env.cr.sql_log_count - start
+
+    def test_installments_cached(self):
+        order = self._create_insurance_orders(1)
+        base_date = order._get_payment_schedule_base_date()
+        first = self.payment_term_3._get_installments(order.amount_total, order.currency_id, base_date)
+        with self.assertQueryCount(0):
+            second = self.payment_term_3._get_installments(order.amount_total, order.currency_id, base_date)
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 3)
+
+    def test_portal_plans_cached(self):
+        order = self._create_insurance_orders(1)
+        order._get_payment_term_plans()
+        with self.assertQueryCount(0):
+            order._get_payment_term_plans()
+
+    def test_constraint_uses_stored_totals(self):
+        orders = self._create_insurance_orders(10)
+        orders.invalidate_recordset()
+        orders.payment_schedule_lines.mapped('amount')
+        orders.mapped('payment_schedule_expected_total')
+        with self.assertQueryCount(0):
+            orders._check_payment_schedule_total()
+
+    def test_contract_attachment_names_batched(self):
+        small = self._create_insurance_orders(1)
+        large = self._create_insurance_orders(20)
+        small_count = self._count_queries(lambda: [order.get_contract_attachment_name() for order in small])
+        large_count = self._count_queries(lambda: [order.get_contract_attachment_name() for order in large])
+        self.assertLessEqual(large_count, small_count + 2)
+
+    def test_contract_cache_keeps_uploaded_pdfs(self):
+        order = self._create_insurance_orders(1)
+        attachment_vals = {'res_model': 'sale.order', 'res_id': order.id, 'raw': b'%PDF-1.4', 'mimetype': 'application/pdf'}
+        generated, uploaded = self.env['ir.attachment'].create([
+            dict(attachment_vals, name=order.get_contract_attachment_name()),
+            dict(attachment_vals, name=f'Contrato - {order.name} - firmado.pdf'),
+        ])
+        order._invalidate_contract_report_cache()
+        self.assertFalse(generated.exists())
+        self.assertTrue(uploaded.exists())
+
+    def test_term_change_scales_with_batches(self):
+        small = self._create_insurance_orders(1)
+        large = self._create_insurance_orders(100)
+        small_count = self._count_queries(lambda: small.write({'payment_term_id': self.payment_term_1.id}))
+        large_count = self._count_queries(lambda: large.write({'payment_term_id': self.payment_term_1.id}))
+        self.assertLessEqual(large_count, small_count + 10)
+
+    def test_regeneration_keeps_line_ids(self):
+        order = self._create_insurance_orders(1)
+        line_ids = order.payment_schedule_lines.ids
+        order._regenerate_payment_schedules()
+        self.assertEqual(order.payment_schedule_lines.ids, line_ids)
+        order.order_line.price_unit = 1010.0
+        order._regenerate_payment_schedules()
+        self.assertEqual(order.payment_schedule_lines.ids, line_ids)
+        self.assertAlmostEqual(order.payment_schedule_total, order.payment_schedule_expected_total)
+
+    def test_invoice_adjustment_lines_batched(self):
+        small = self._create_insurance_orders(1)
+        large = self._create_insurance_orders(20)
+        (small | large).action_confirm()
+        SaleOrder = type(self.env['sale.order'])
+        with patch.object(SaleOrder, '_create_financial_adjustment_lines', lambda self, moves: None):
+            small_moves = small._create_invoices()
+            large_moves = large._create_invoices()
+        small_count = self._count_queries(lambda: small._create_financial_adjustment_lines(small_moves))
+        large_count = self._count_queries(lambda: large._create_financial_adjustment_lines(large_moves))
+        self.assertLessEqual(large_count, small_count + 10)
+        adjustment_lines = large_moves.invoice_line_ids.filtered(lambda l: l.name.startswith("Ajuste Financiero"))
+        self.assertEqual(len(adjustment_lines), 20)
+
+
+@tagged('post_install', '-at_install', '-standard', 'insurance_api_benchmark')
+class TestInsuranceApiBenchmark(InsuranceApiHttpCommon):
+    """
+    Tiempos y consultas de los caminos críticos a 1, 100 y 10.000 órdenes.
+    Se ejecuta con --test-tags insurance_api_benchmark y escribe los resultados en
+    INSURANCE_API_BENCHMARK_OUTPUT (por defecto, insurance_api_benchmark.json en el directorio temporal).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = []
+
+    @classmethod
+    def tearDownClass(cls):
+        output = os.environ.get('INSURANCE_API_BENCHMARK_OUTPUT') or os.path.join(
+            tempfile.gettempdir(), 'insurance_api_benchmark.json')
+        with open(output, 'w') as f:
+            json.dump(cls.results, f, indent=2)
+        super().tearDownClass()
+
+    def _measure(self, name, scale, func, calls=1):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        func()
+        self.env.flush_all()
+        elapsed = time.perf_counter() - start
+        self.results.append({
+            'name': name,
+            'scale': scale,
+            'calls': calls,
+            'seconds': round(elapsed, 6),
+            'queries': self.env.cr.sql_log_count - queries,
+        })
+
+    def _portal_call(self, route, params):
+        return self.make_jsonrpc_request(route, params)
+
+    def test_benchmark_hot_paths(self):
+        report = self.env.ref('sale.action_report_pro_forma_invoice')
+        with patch.object(portal._rate_limiter, 'max_requests', 10 ** 9), \
+                patch.object(portal._ip_rate_limiter, 'max_requests', 10 ** 9):
+            for scale in BENCHMARK_SCALES:
+                created = []
+                self._measure('create', scale, lambda: created.append(self._create_insurance_orders(scale)))
+                orders = created[0]
+
+                self._measure('write_payment_term', scale,
+                              lambda: orders.write({'payment_term_id': self.payment_term_1.id}))
+                self._measure('write_payment_term_back', scale,
+                              lambda: orders.write({'payment_term_id': self.payment_term_3.id}))
+
+                def onchange():
+                    for order in orders[:BENCHMARK_PORTAL_SAMPLE]:
+                        new_order = order.new(origin=order)
+                        new_order.payment_term_id = self.payment_term_1
+                        new_order._onchange_payment_term_id()
+                self._measure('onchange_payment_term_id', scale, onchange,
+                              calls=min(scale, BENCHMARK_PORTAL_SAMPLE))
+
+                self._measure('contract_report_html', scale,
+                              lambda: self.env['ir.actions.report']._render_qweb_html(report, orders.ids))
+
+                sample = orders[:BENCHMARK_PORTAL_SAMPLE]
+                for order in sample:
+                    order._portal_ensure_token()
+                routes = [
+                    ('get_payment_term_installments', lambda o: {
+                        'term_id': self.payment_term_3.id, 'access_token': o.access_token}),
+                    ('get_all_payment_term_installments', lambda o: {'access_token': o.access_token}),
+                    ('update_payment_term', lambda o: {
+                        'term_id': self.payment_term_1.id, 'access_token': o.access_token}),
+                ]
+                for route, params in routes:
+                    self._measure(f'portal_{route}', scale, lambda: [
+                        self._portal_call(f'/my/orders/{order.id}/{route}', params(order)) for order in sample
+                    ], calls=len(sample))
+                self._measure('portal_select_payment_term', scale, lambda: [
+                    self.url_open(f'/my/orders/{order.id}/select_payment_term', data={
+                        'payment_term_id': self.payment_term_3.id, 'access_token': order.access_token,
+                        'csrf_token': http.Request.csrf_token(self),
+                    }, allow_redirects=False) for order in sample
+                ], calls=len(sample))
+                self._measure('portal_contract_view', scale, lambda: [
+                    self.url_open(f'/my/contract/{order.id}?access_token={order.access_token}')
+                    for order in sample
+                ], calls=len(sample))
+                self._measure('portal_contract_sign', scale, lambda: [
+                    self._portal_call(f'/my/contract/{order.id}/sign', {
+                        'access_token': order.access_token, 'name': "Test", 'signature': SIGNATURE_PNG,
+                    }) for order in sample
+                ], calls=len(sample))
+
+                orders.action_confirm()
+                self._measure('create_invoices', scale, lambda: orders._create_invoices())
+
+        self.assertEqual(len(self.results), len(BENCHMARK_SCALES) * 12)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import io
+from unittest.mock import patch
+
+from PIL import Image
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from odoo.addons.insurance_api.controllers import portal
+from .common import InsuranceApiHttpCommon
+
+
+@tagged('post_install', '-at_install')
+class TestInsuranceApiPortal(InsuranceApiHttpCommon):
+
+    def test_all_installments_requires_token_or_access(self):
+        order = self._create_insurance_orders(1)
+        order._portal_ensure_token()
+        route = f'/my/orders/{order.id}/get_all_payment_term_installments'
+
+        result = self.make_jsonrpc_request(route, {})
+        self.assertNotIn('plans', result)
+
+        result = self.make_jsonrpc_request(route, {'access_token': "invalid"})
+        self.assertNotIn('plans', result)
+
+        result = self.make_jsonrpc_request(route, {'access_token': order.access_token})
+        self.assertTrue(result['plans'])
+
+    def test_writes_require_token_or_write_access(self):
+        order = self._create_insurance_orders(1)
+        order._portal_ensure_token()
+        png = 'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=='
+
+        result = self.make_jsonrpc_request(f'/my/orders/{order.id}/update_payment_term',
+                                           {'term_id': self.payment_term_1.id})
+        self.assertFalse(result['success'])
+        result = self.make_jsonrpc_request(f'/my/contract/{order.id}/sign',
+                                           {'name': "Anónimo", 'signature': png})
+        self.assertIn('error', result)
+        self.assertEqual(order.payment_term_id, self.payment_term_3)
+        self.assertFalse(order.contract_signature)
+
+        result = self.make_jsonrpc_request(f'/my/orders/{order.id}/update_payment_term',
+                                           {'term_id': self.payment_term_1.id, 'access_token': order.access_token})
+        self.assertTrue(result['success'])
+        self.assertEqual(order.payment_term_id, self.payment_term_1)
+
+    def test_rate_limit_ignores_changing_tokens(self):
+        order = self._create_insurance_orders(1)
+        route = f'/my/orders/{order.id}/get_all_payment_term_installments'
+        with patch.object(portal, '_ip_rate_limiter', portal.PortalRateLimiter(3, 60)):
+            for index in range(3):
+                result = self.make_jsonrpc_request(route, {'access_token': f"token-{index}"})
+                self.assertNotIn('Demasiadas', result.get('error', ''))
+            result = self.make_jsonrpc_request(route, {'access_token': "token-3"})
+            self.assertIn('Demasiadas', result['error'])
+
+    def test_signature_resolution_is_bounded(self):
+        # Una imagen lisa enorme comprime a pocos KB en PNG
+        output = io.BytesIO()
+        Image.new('1', (10000, 8000)).save(output, format='PNG')
+        signature = base64.b64encode(output.getvalue())
+        self.assertLess(len(signature), 1024 * 1024)
+        with self.assertRaises(UserError):
+            self.env['sale.order']._prepare_contract_signature(signature)
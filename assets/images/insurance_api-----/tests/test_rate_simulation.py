@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import tagged
+
+from odoo.addons.insurance_api.models import installment_engine
+from .common import InsuranceApiCommon
+
+# Montos cuyos porcentajes caen en medio centavo (100.05 * 30% = 30.015)
+HALF_CENT_AMOUNTS = (100.05, 333.35, 1234.55, 50.15, 999.99)
+
+
+@tagged('post_install', '-at_install')
+class TestRateSimulation(InsuranceApiCommon):
+    """
+    La simulación de tasas, con NumPy y sin NumPy, debe dar lo mismo que sumar
+    las cuotas que genera compute_installments para cada orden.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.payment_term_mixed = cls.env['account.payment.term'].create({
+            'name': "Anticipo fijo y 2 cuotas",
+            'line_ids': [
+                (0, 0, {'installment_number': 1, 'value': 'fixed', 'value_amount': 25.0, 'nb_days': 0}),
+                (0, 0, {'installment_number': 2, 'value': 'percent', 'value_amount': 70.0,
+                        'interest_rate': 3.5, 'nb_days': 30}),
+                (0, 0, {'installment_number': 3, 'value': 'percent', 'value_amount': 30.0,
+                        'interest_rate': 3.5, 'discount_rate': 1.5, 'nb_days': 60}),
+            ],
+        })
+        cls.orders = cls.env['sale.order'].concat(*[
+            cls._create_insurance_orders(1, payment_term=cls.payment_term_mixed, price_unit=price_unit)
+            for price_unit in HALF_CENT_AMOUNTS
+        ])
+
+    def _expected_total(self, term_lines, amounts_total, rounding):
+        today = fields.Date.context_today(self.env['sale.order'])
+        return sum(
+            installment.amount
+            for amount_total in amounts_total if amount_total > 0
+            for installment in installment_engine.compute_installments(term_lines, amount_total, rounding, today)
+        )
+
+    def _assert_simulation_matches(self, line_rates):
+        term = self.payment_term_mixed
+        lines = term.line_ids.sorted(key=lambda r: (r.installment_number, r.id))
+        term_lines = tuple(
+            term_line._replace(**line_rates.get(line.id, {}))
+            for line, term_line in zip(lines, term._get_installment_term_lines())
+        )
+        currency = self.orders.currency_id
+        expected = self._expected_total(term_lines, self.orders.mapped('amount_total'), currency.rounding)
+
+        results = term.simulate_rate_change(line_rates)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['order_count'], len(self.orders))
+        self.assertEqual(results[0]['simulated_total'], currency.round(expected))
+        return results[0]
+
+    def test_simulation_without_changes_matches_schedules(self):
+        result = self._assert_simulation_matches({})
+        self.assertEqual(result['delta'], 0.0)
+
+    def test_simulation_matches_installments(self):
+        percent_line = self.payment_term_mixed.line_ids.filtered(lambda l: l.installment_number == 2)
+        self._assert_simulation_matches({percent_line.id: {'interest_rate': 7.5, 'discount_rate': 2.5}})
+
+    def test_simulation_without_numpy(self):
+        percent_line = self.payment_term_mixed.line_ids.filtered(lambda l: l.installment_number == 2)
+        with patch.object(installment_engine, 'np', None):
+            self._assert_simulation_matches({})
+            self._assert_simulation_matches({percent_line.id: {'interest_rate': 7.5, 'discount_rate': 2.5}})
+
+    def test_engine_arrays_match_compute_installments(self):
+        # Incluye una línea 'balance', que el ORM de Odoo 18 ya no permite cargar pero el motor acepta
+        np = installment_engine.np
+        if np is None:
+            self.skipTest("NumPy no está instalado")
+        term_lines = (
+            installment_engine.TermLine(1, 'fixed', 25.0, 0.0, 0.0, False, 'days_after', 0),
+            installment_engine.TermLine(2, 'percent', 30.0, 3.5, 0.0, False, 'days_after', 30),
+            installment_engine.TermLine(3, 'percent', 25.0, 0.0, 1.5, False, 'days_after', 60),
+            installment_engine.TermLine(4, 'balance', 0.0, 3.5, 1.5, False, 'days_after', 90),
+        )
+        amounts_total = HALF_CENT_AMOUNTS + (0.0, -10.0)
+        totals = installment_engine.installment_totals_arrays(
+            term_lines, np.array(amounts_total, dtype=float), np.full(len(amounts_total), 0.01))
+        for amount_total, total in zip(amounts_total, totals):
+            expected = self._expected_total(term_lines, [amount_total], 0.01)
+            self.assertAlmostEqual(float(total), expected, places=6, msg=amount_total)
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import tagged
+
+from .common import InsuranceApiCommon
+
+
+@tagged('post_install', '-at_install')
+class TestScheduleLineRates(InsuranceApiCommon):
+
+    def test_rate_change_on_unsaved_line(self):
+        order = self._create_insurance_orders(1)
+        line = self.env['sale.order.payment.schedule.line'].new({
+            'order_id': order.id,
+            'installment_number': 4,
+            'amount': 105.0,
+            'interest_rate': 5.0,
+        })
+        # El formulario envía las tasas con que se calculó el monto
+        self.assertEqual(line.onchange_interest_rate, 5.0)
+        line.interest_rate = 10.0
+        line._onchange_rates()
+        self.assertAlmostEqual(line.amount, 110.0)
+
+    def test_rate_change_keeps_manual_amount(self):
+        order = self._create_insurance_orders(1)
+        line = order.payment_schedule_lines.sorted('installment_number')[:1]
+        new_line = line.new(origin=line)
+        # 420 con 5% de interés; se edita a mano a 210 y luego se quita el interés
+        self.assertEqual(new_line.onchange_interest_rate, 5.0)
+        new_line.amount = 210.0
+        new_line.interest_rate = 0.0
+        new_line._onchange_rates()
+        self.assertAlmostEqual(new_line.amount, 200.0)
+
+    def test_regeneration_keeps_status_of_unchanged_lines(self):
+        order = self._create_insurance_orders(1)
+        first, second, third = order.payment_schedule_lines.sorted('installment_number')
+        first.payment_status = 'overdue'
+        second.payment_status = 'paid'
+        order._regenerate_payment_schedules()
+        self.assertEqual((first.payment_status, second.payment_status, third.payment_status),
+                         ('overdue', 'paid', 'pending'))
+
+    def test_regeneration_derives_status_of_changed_lines(self):
+        order = self._create_insurance_orders(1)
+        first = order.payment_schedule_lines.sorted('installment_number')[:1]
+        first.payment_status = 'paid'
+        order.order_line.price_unit = 2000.0
+        self.assertEqual(first.amount, 840.0)
+        self.assertEqual(first.payment_status, 'pending')
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import payment_term_rate_simulation
+from . import sale_order_insurance_mass_update
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, models
+
+
+class PaymentTermRateSimulation(models.TransientModel):
+    """
+    Simulador de cambios de tasas: muestra cuánto se moverían los totales de
+    los cronogramas de las órdenes abiertas con el término si sus líneas
+    tuvieran otras tasas de interés o descuento. No modifica ninguna orden.
+    """
+    _name = 'account.payment.term.rate.simulation'
+    _description = 'Simulación de Tasas de Término de Pago'
+
+    payment_term_id = fields.Many2one('account.payment.term', string="Término de Pago", required=True,
+                                      default=lambda self: self._default_payment_term_id())
+    line_ids = fields.One2many('account.payment.term.rate.simulation.line', 'simulation_id', string="Cuotas",
+                               compute='_compute_line_ids', store=True, readonly=False)
+    result_ids = fields.One2many('account.payment.term.rate.simulation.result', 'simulation_id',
+                                 string="Resultados", readonly=True)
+
+    @api.model
+    def _default_payment_term_id(self):
+        if self.env.context.get('active_model') == 'account.payment.term':
+            return self.env.context.get('active_id')
+        return False
+
+    @api.depends('payment_term_id')
+    def _compute_line_ids(self):
+        for simulation in self:
+            term_lines = simulation.payment_term_id.line_ids.sorted(key=lambda r: (r.installment_number, r.id))
+            simulation.line_ids = [(5, 0, 0)] + [(0, 0, {
+                'term_line_id': line.id,
+                'new_interest_rate': line.interest_rate,
+                'new_discount_rate': line.discount_rate,
+            }) for line in term_lines]
+
+    def action_simulate(self):
+        self.ensure_one()
+        results = self.payment_term_id.simulate_rate_change({
+            line.term_line_id.id: {
+                'interest_rate': line.new_interest_rate,
+                'discount_rate': line.new_discount_rate,
+            }
+            for line in self.line_ids
+        })
+        self.result_ids = [(5, 0, 0)] + [(0, 0, result) for result in results]
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+
+class PaymentTermRateSimulationLine(models.TransientModel):
+    _name = 'account.payment.term.rate.simulation.line'
+    _description = 'Cuota de la Simulación de Tasas'
+    _order = 'installment_number, id'
+
+    simulation_id = fields.Many2one('account.payment.term.rate.simulation', required=True, ondelete='cascade')
+    term_line_id = fields.Many2one('account.payment.term.line', string="Línea del Término", required=True,
+                                   ondelete='cascade')
+    installment_number = fields.Integer(related='term_line_id.installment_number')
+    value = fields.Selection(related='term_line_id.value')
+    value_amount = fields.Float(related='term_line_id.value_amount')
+    interest_rate = fields.Float(related='term_line_id.interest_rate', string="Interés Actual (%)")
+    discount_rate = fields.Float(related='term_line_id.discount_rate', string="Descuento Actual (%)")
+    new_interest_rate = fields.Float(string="Interés Simulado (%)", digits='Discount')
+    new_discount_rate = fields.Float(string="Descuento Simulado (%)", digits='Discount')
+
+
+class PaymentTermRateSimulationResult(models.TransientModel):
+    _name = 'account.payment.term.rate.simulation.result'
+    _description = 'Resultado de la Simulación de Tasas'
+
+    simulation_id = fields.Many2one('account.payment.term.rate.simulation', required=True, ondelete='cascade')
+    currency_id = fields.Many2one('res.currency', string="Moneda", required=True)
+    order_count = fields.Integer(string="Órdenes")
+    current_total = fields.Monetary(string="Total Actual")
+    simulated_total = fields.Monetary(string="Total Simulado")
+    delta = fields.Monetary(string="Diferencia")
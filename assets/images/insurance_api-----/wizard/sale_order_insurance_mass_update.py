@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+from markupsafe import Markup, escape
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+# Campos de seguro que se pueden editar en lote
+MASS_UPDATE_FIELDS = [
+    'school_year', 'insurer', 'events_limit', 'in_itinere_limit', 'assistance_limit', 'contract_end_date',
+]
+
+
+class SaleOrderInsuranceMassUpdate(models.TransientModel):
+    """
+    Edición en lote de los parámetros del seguro. Escribe las órdenes por
+    bloques sin el seguimiento por campo y deja un único mensaje por orden
+    con todos los cambios, creados juntos para cada bloque.
+    """
+    _name = 'sale.order.insurance.mass.update'
+    _description = 'Edición en Lote de Parámetros del Seguro'
+
+    order_ids = fields.Many2many('sale.order', string="Órdenes de Venta", required=True,
+                                 default=lambda self: self._default_order_ids())
+    batch_size = fields.Integer(string="Órdenes por Bloque", default=500)
+
+    update_school_year = fields.Boolean(string="Modificar Período Lectivo")
+    school_year = fields.Char(string="Período Lectivo")
+    update_insurer = fields.Boolean(string="Modificar Aseguradora")
+    insurer = fields.Char(string="Aseguradora")
+    update_events_limit = fields.Boolean(string="Modificar Límite por evento")
+    events_limit = fields.Float(string="Límite por evento")
+    update_in_itinere_limit = fields.Boolean(string="Modificar Límite in itinere")
+    in_itinere_limit = fields.Float(string="Límite in itinere")
+    update_assistance_limit = fields.Boolean(string="Modificar Límite de Asistencia médica")
+    assistance_limit = fields.Float(string="Límite total de Asistencia médica")
+    update_contract_end_date = fields.Boolean(string="Modificar Fecha de Fin del Contrato")
+    contract_end_date = fields.Date(string="Fecha de Fin del Contrato")
+
+    @api.model
+    def _default_order_ids(self):
+        if self.env.context.get('active_model') == 'sale.order':
+            return [(6, 0, self.env.context.get('active_ids', []))]
+        return False
+
+    def _get_update_vals(self):
+        self.ensure_one()
+        return {
+            field_name: self[field_name]
+            for field_name in MASS_UPDATE_FIELDS
+            if self[f'update_{field_name}']
+        }
+
+    @api.model
+    def _format_tracking_value(self, value):
+        return '' if value is False or value is None else str(value)
+
+    def _get_tracking_body(self, order, vals):
+        """Mensaje con todos los cambios de una orden; None si no cambia nada"""
+        changes = []
+        for field_name, new_value in vals.items():
+            field = order._fields[field_name]
+            old_value = order[field_name]
+            if field.type == 'char':
+                old_value, new_value = old_value or '', new_value or ''
+            if old_value == new_value:
+                continue
+            changes.append(Markup('<li>%s: %s &#8594; %s</li>') % (
+                field._description_string(self.env),
+                escape(self._format_tracking_value(old_value)),
+                escape(self._format_tracking_value(new_value))))
+        if not changes:
+            return None
+        return Markup('<p>%s</p><ul>%s</ul>') % (_("Edición en lote de parámetros del seguro"), Markup().join(changes))
+
+    def action_apply(self):
+        self.ensure_one()
+        vals = self._get_update_vals()
+        if not vals:
+            raise UserError(_("Seleccione al menos un campo para modificar."))
+
+        orders = self.order_ids.sorted('id')
+        batch_size = max(self.batch_size, 1)
+        for start in range(0, len(orders), batch_size):
+            batch = orders[start:start + batch_size]
+            bodies = {}
+            for order in batch:
+                body = self._get_tracking_body(order, vals)
+                if body:
+                    bodies[order.id] = body
+            if not bodies:
+                continue
+
+            # Ninguno de estos campos es financiero: el write no regenera cronogramas
+            changed_orders = batch.browse(list(bodies))
+            changed_orders.with_context(tracking_disable=True).write(vals)
+            changed_orders._message_log_batch(bodies=bodies)
+        return {'type': 'ir.actions.act_window_close'}